@@ -1,26 +1,32 @@
 # -*- coding: utf-8 -*-
 """
 Script unifié pour scraper des données financières depuis plusieurs sources.
-Chaque source a sa propre fonction qui retourne un dictionnaire.
-La fonction principale rassemble tout dans un DataFrame Pandas.
+Chaque source a sa propre fonction qui retourne un dictionnaire
+{instrument: valeur}, les valeurs en nombres (taux en pourcentage).
+La fonction principale rassemble tout dans un DataFrame typé, une ligne par
+instrument, au format de la base des taux (pricing/rate_store.py).
 """
 
 import requests
-from bs4 import BeautifulSoup
+import lxml.html
 import re
+import os
 import json
 import json5
 import time
 import logging
+import threading
+import atexit
+import queue
+from contextlib import contextmanager
+from pathlib import Path
 import pandas as pd
+from pricing.rate_store import INSTRUMENTS, SNAPSHOT_COLUMNS, SNAPSHOT_DTYPES
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
 
-# Imports pour Selenium (utilisé uniquement pour Bloomberg)
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-
-# Import pour le taux de change
-from forex_python.converter import CurrencyRates
+# Selenium (Bloomberg) et forex_python (taux de change) ne sont importés que par
+# LiveSource, au moment de l'appel : les exécutions rejouées s'en passent
 
 # --- CONFIGURATION ---
 # Masque les logs détaillés des bibliothèques pour une sortie propre
@@ -33,190 +39,613 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
+# Validateurs HTTP (ETag, Last-Modified) et dernières versions des pages, entre deux exécutions
+HTTP_CACHE_DIR = os.environ.get("SCRAPING_HTTP_CACHE", str(Path(__file__).resolve().parent / "data" / "http_cache"))
+
+# Pages scrapées
+EURIBOR_URL = "https://www.euribor-rates.eu/fr/taux-euribor-actuels/"
+SOFR_URL = "https://www.global-rates.com/en/interest-rates/cme-term-sofr/"
+BLOOMBERG_URL = "https://www.bloomberg.com/markets/rates-bonds/government-bonds/us"
+TRADINGVIEW_URL = "https://www.tradingview.com/markets/bonds/prices-eu/"
+# Pages rendues en JavaScript, à charger dans Chrome, avec le script attendu
+# avant de lire la page
+RENDERED_URLS = {BLOOMBERG_URL: "b.startConfig"}
+# Chrome headless réutilisés : nombre de navigateurs, et pages chargées par
+# chacun avant d'en démarrer un neuf (la mémoire de Chrome ne fait que croître)
+BROWSER_POOL_SIZE = int(os.environ.get("SCRAPING_BROWSERS", 1))
+BROWSER_MAX_USES = int(os.environ.get("SCRAPING_BROWSER_MAX_USES", 50))
+# Ressources jamais chargées : seuls le HTML et les scripts comptent
+BLOCKED_RESOURCES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                     "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm"]
+EXCHANGE_RATES = [("EUR", "USD")]
+
 # =============================================================================
-# FONCTIONS DE SCRAPING INDIVIDUELLES
+# CLIENT HTTP
 # =============================================================================
+# Une session partagée par toutes les sources : connexions persistantes
+# (keep-alive) réutilisées d'un appel à l'autre, pages compressées (gzip, et
+# brotli si le module brotli est installé), nouvelles tentatives espacées sur
+# les erreurs passagères, et requêtes conditionnelles : une page déjà vue est
+# redemandée avec son ETag / Last-Modified, et si le site répond 304 la
+# version gardée est renvoyée telle quelle, sans téléchargement ni analyse.
+# Le délai d'un appel borne l'appel entier : les nouvelles tentatives et les
+# attentes entre elles se partagent ce qui en reste, et une attente qui le
+# dépasserait n'est pas faite.
 
-def get_euribor_rates():
-    """Récupère les taux Euribor et les retourne dans un dictionnaire."""
-    try:
-        url = "https://www.euribor-rates.eu/fr/taux-euribor-actuels/"
-        response = requests.get(url, headers=HEADERS, timeout=10)
+# Réponses passagères, redemandées
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class HttpClient:
+    """
+    Requêtes GET à travers une session partagée. folder garde les validateurs
+    et les pages sur disque d'une exécution à l'autre (None : en mémoire).
+    Les compteurs downloads / not_modified comptent les réponses 200 et 304.
+    """
+
+    def __init__(self, folder=HTTP_CACHE_DIR, retries=3, backoff=0.5, pool_size=8):
+        self.folder = Path(folder) if folder else None
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+        self.retries = retries
+        self.backoff = backoff
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._validated = {}  # url -> {"etag", "last_modified", "text"}
+        self._lock = threading.Lock()
+        self.downloads = 0
+        self.not_modified = 0
+
+    def _paths(self, url):
+        name = fixture_name(url)
+        return self.folder / name, self.folder / f"{name}.json"
+
+    def _entry(self, url):
+        with self._lock:
+            entry = self._validated.get(url)
+        if entry is not None or self.folder is None:
+            return entry
+        body, sidecar = self._paths(url)
+        try:
+            entry = {**json.loads(sidecar.read_text()), "text": body.read_text(encoding="utf-8")}
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._validated[url] = entry
+        return entry
+
+    def _remember(self, url, entry):
+        with self._lock:
+            self._validated[url] = entry
+        if self.folder is None:
+            return
+        body, sidecar = self._paths(url)
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            for path, content in [(body, entry["text"]),
+                                  (sidecar, json.dumps({key: entry[key] for key in ("etag", "last_modified")}))]:
+                tmp = path.with_name(path.name + ".tmp")
+                tmp.write_text(content, encoding="utf-8")
+                os.replace(tmp, path)
+        except OSError:
+            pass  # Le cache disque n'est qu'une optimisation
+
+    def _pause(self, attempt, response):
+        """Attente avant la tentative suivante : Retry-After en secondes s'il est donné, sinon 0,5 s, 1 s, 2 s..."""
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (AttributeError, KeyError, ValueError):
+            return self.backoff * 2 ** attempt
+
+    def _send(self, url, headers, timeout):
+        """GET avec nouvelles tentatives sur les erreurs passagères, le tout en au plus timeout secondes."""
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            try:
+                response, error = self.session.get(url, headers=headers,
+                                                   timeout=max(deadline - time.monotonic(), 0.01)), None
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            pause = self._pause(attempt, response)
+            if attempt == self.retries or time.monotonic() + pause >= deadline:
+                if error is not None:
+                    raise error
+                return response  # Dernière réponse en erreur, levée par raise_for_status
+            time.sleep(pause)
+            attempt += 1
+
+    def get(self, url, timeout=10):
+        """
+        Texte de la page ; la version gardée si le site répond 304 (même objet
+        str). timeout borne l'appel, nouvelles tentatives comprises.
+        """
+        entry = self._entry(url)
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self._send(url, headers, timeout)
+        if response.status_code == 304 and entry is not None:
+            self.not_modified += 1
+            return entry["text"]
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        table = soup.find("table", class_="table-striped")
-        
-        rates = {}
-        if table:
-            for row in table.find("tbody").find_all("tr"):
-                cells = row.find_all(['th', 'td'])
-                if len(cells) > 1:
-                    maturity = cells[0].get_text(strip=True)
-                    rate = cells[1].get_text(strip=True).replace('%', '').strip()
-                    if "1 mois" in maturity: rates["Euribor 1 Mois"] = rate
-                    elif "3 mois" in maturity: rates["Euribor 3 Mois"] = rate
-                    elif "6 mois" in maturity: rates["Euribor 6 Mois"] = rate
-                    elif "12 mois" in maturity: rates["Euribor 12 Mois"] = rate
-        return rates
-    except Exception as e:
-        print(f"[ERREUR] Euribor: {e}")
-        return {}
+        self.downloads += 1
+        text = response.text
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._remember(url, {"etag": etag, "last_modified": last_modified, "text": text})
+        return text
+
+HTTP = HttpClient()
+
+# =============================================================================
+# NAVIGATEURS
+# =============================================================================
+# Démarrer Chrome (et installer son driver) coûte plusieurs secondes : les
+# navigateurs sont gardés d'un appel à l'autre, vérifiés avant chaque usage,
+# et remplacés après BROWSER_MAX_USES pages ou au premier signe de panne.
+# Chaque page est rendue avec le chargement "eager" (le DOM, sans attendre les
+# sous-ressources), sans images, CSS ni polices, et lue dès que le script
+# attendu est présent plutôt qu'après une attente fixe. L'attente d'un
+# navigateur libre, le chargement et celle du script se partagent le délai
+# du rendu.
+
+class BrowserPool:
+    """Au plus size Chrome headless, démarrés à la demande et fermés en fin de programme."""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES):
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()  # (driver, pages chargées)
+        self._busy = set()  # Navigateurs prêtés, fermés eux aussi en fin de programme
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self.started = 0
+        atexit.register(self.close)
+
+    def _start(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2,
+                                                  "profile.managed_default_content_settings.stylesheets": 2,
+                                                  "profile.managed_default_content_settings.fonts": 2})
+        driver = webdriver.Chrome(service=Service(self._driver_path), options=options)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES})
+        self.started += 1
+        return driver
+
+    @staticmethod
+    def _healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """
+        Un navigateur en état de marche, rendu au pool (ou fermé s'il est usé
+        ou en panne) à la sortie ; TimeoutError si aucun ne se libère en timeout secondes.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"Aucun navigateur libre en {timeout:g}s")
+        try:
+            try:
+                driver, uses = self._idle.get_nowait()
+                if not self._healthy(driver):
+                    self._quit(driver)
+                    driver, uses = self._start(), 0
+            except queue.Empty:
+                driver, uses = self._start(), 0
+            with self._lock:
+                self._busy.add(driver)
+            failed = False
+            try:
+                yield driver
+            except Exception:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._busy.discard(driver)
+                uses += 1
+                if uses >= self.max_uses or (failed and not self._healthy(driver)):
+                    self._quit(driver)
+                else:
+                    self._idle.put((driver, uses))
+        finally:
+            self._slots.release()
+
+    def render(self, url, script, timeout=30):
+        """Code source de la page dès que l'un de ses scripts contient script, en au plus timeout secondes."""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        deadline = time.monotonic() + timeout
+
+        def remaining():
+            return max(deadline - time.monotonic(), 0.1)
+
+        with self.driver(timeout) as driver:
+            driver.set_page_load_timeout(remaining())
+            driver.get(url)
+            WebDriverWait(driver, remaining(), poll_frequency=0.1).until(lambda d: d.execute_script(
+                "return Array.from(document.scripts).some(s => s.text.includes(arguments[0]))", script))
+            return driver.page_source
+
+    def close(self):
+        # Un navigateur encore prêté appartient à un collecteur abandonné (thread daemon) : fermé aussi
+        with self._lock:
+            busy, self._busy = list(self._busy), set()
+        for driver in busy:
+            self._quit(driver)
+        while True:
+            try:
+                driver, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(driver)
+
+BROWSERS = BrowserPool()
+
+# =============================================================================
+# SOURCES DES PAGES
+# =============================================================================
+# Chaque fonction de scraping lit ses pages à travers une source. LiveSource
+# va sur les sites ; ReplaySource relit des pages enregistrées (record_pages),
+# depuis un dossier ou un serveur HTTP local (benchmarks/fixture_server.py),
+# pour des exécutions hors ligne, déterministes et chronométrables.
+# SCRAPING_REPLAY=<dossier ou URL> remplace la source par défaut.
+
+def fixture_name(url):
+    """Nom de fichier d'une page enregistrée, tiré de son URL."""
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", url.split("://", 1)[-1]).strip("_") + ".html"
+
+class LiveSource:
+    """Pages téléchargées sur les sites, à travers http et browsers (HTTP et BROWSERS par défaut)."""
+
+    def __init__(self, http=None, browsers=None):
+        self.http = http or HTTP
+        self.browsers = browsers or BROWSERS
+
+    def page(self, url, timeout=10):
+        if url in RENDERED_URLS:
+            return self.browsers.render(url, RENDERED_URLS[url], timeout)
+        return self.http.get(url, timeout)
+
+    def exchange_rate(self, base, quote, timeout=10):
+        from forex_python.converter import CurrencyRates
+
+        # forex_python ne prend pas de délai : seul le thread daemon de run_collection borne cet appel
+        return CurrencyRates().get_rate(base, quote)
+
+class ReplaySource:
+    """Pages enregistrées dans location/pages, location étant un dossier ou une URL http://."""
+
+    def __init__(self, location, http=None):
+        self.location = str(location).rstrip("/")
+        # Validateurs en mémoire seulement : le serveur local n'a rien à garder sur disque
+        self.http = http or (HttpClient(folder=None) if "://" in self.location else None)
+
+    def _read(self, name, timeout=10):
+        target = f"{self.location}/pages/{name}"
+        if "://" in target:
+            return self.http.get(target, timeout)
+        return Path(target).read_text(encoding="utf-8")
+
+    def page(self, url, timeout=10):
+        return self._read(fixture_name(url), timeout)
+
+    def exchange_rate(self, base, quote, timeout=10):
+        return json.loads(self._read("exchange_rates.json", timeout))[f"{base}/{quote}"]
+
+def record_pages(folder, source=None):
+    """Enregistre les pages scrapées et les taux de change pour ReplaySource."""
+    source = source or LiveSource()
+    pages = Path(folder) / "pages"
+    pages.mkdir(parents=True, exist_ok=True)
+    for url in [EURIBOR_URL, SOFR_URL, BLOOMBERG_URL, TRADINGVIEW_URL]:
+        (pages / fixture_name(url)).write_text(source.page(url), encoding="utf-8")
+    rates = {f"{base}/{quote}": source.exchange_rate(base, quote) for base, quote in EXCHANGE_RATES}
+    (pages / "exchange_rates.json").write_text(json.dumps(rates, indent=2))
+
+SOURCE = ReplaySource(os.environ["SCRAPING_REPLAY"]) if os.environ.get("SCRAPING_REPLAY") else LiveSource()
+
+# =============================================================================
+# FONCTIONS DE SCRAPING INDIVIDUELLES
+# =============================================================================
 
-def get_sofr_rates():
-    """Récupère les taux SOFR et les retourne dans un dictionnaire."""
+# Dernière analyse de chaque page : une page inchangée (réponse 304, ou même
+# texte rejoué) n'est pas réanalysée
+_PARSED = {}
+
+def _parse_once(url, page, parse):
+    previous = _PARSED.get(url)
+    if previous is not None and previous[0] == page:  # Immédiat quand c'est le même objet
+        return dict(previous[1])
+    result = parse(page)
+    _PARSED[url] = (page, result)
+    return dict(result)
+
+# Analyse avec lxml (en C) : la page est construite une fois, puis seul le
+# tableau utile est lu, trouvé par XPath sur ses classes comme le faisait
+# BeautifulSoup ; les scripts de données ne sont décodés qu'après un
+# filtre par sous-chaîne.
+
+def _has_class(name):
+    """Condition XPath : name est l'une des classes de l'élément (class_=name de BeautifulSoup)."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _first(page, xpath):
+    """Premier élément lxml de la page qui répond à xpath, None s'il n'y en a pas."""
+    found = lxml.html.fromstring(page).xpath(xpath)
+    return found[0] if found else None
+
+def _cell_text(cell):
+    """Texte d'une cellule, comme get_text(strip=True) de BeautifulSoup."""
+    return "".join(text.strip() for text in cell.itertext())
+
+def _percent(text):
+    """Taux affiché ("2,006 %", "4.31256%") en nombre, en pourcentage."""
+    return float(text.replace('%', '').strip().replace(',', '.'))
+
+# Les fonctions _fetch_* lèvent leurs erreurs, que run_collection rapporte ;
+# les fonctions get_* appelées seules les affichent et retournent {}
+def _or_empty(label, fetch, source, timeout):
     try:
-        url = "https://www.global-rates.com/en/interest-rates/cme-term-sofr/"
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        table_container = soup.find("div", class_="TableResponsive")
-        table = table_container.find("table") if table_container else None
-
-        rates = {}
-        if table:
-            for row in table.find("tbody").find_all("tr"):
-                cells = row.find_all("td")
-                if len(cells) >= 2:
-                    maturity = cells[0].get_text(strip=True)
-                    rate = cells[1].get_text(strip=True).replace('%', '').strip()
-                    if "1 month" in maturity: rates["SOFR 1 Mois"] = rate
-                    elif "3 months" in maturity: rates["SOFR 3 Mois"] = rate
-                    elif "6 months" in maturity: rates["SOFR 6 Mois"] = rate
-                    elif "12 months" in maturity: rates["SOFR 12 Mois"] = rate
-        return rates
+        return fetch(source, timeout)
     except Exception as e:
-        print(f"[ERREUR] SOFR: {e}")
+        print(f"[ERREUR] {label}: {e}")
         return {}
 
-def get_bloomberg_yields():
-    """Récupère les rendements US Treasury via Selenium."""
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--start-maximized")
-    options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+def _parse_euribor(page):
+    table = _first(page, f"//table[{_has_class('table-striped')}]")
     
-    yields = {}
-    try:
-        url = "https://www.bloomberg.com/markets/rates-bonds/government-bonds/us"
-        driver.get(url)
-        time.sleep(5)
-        page_source = driver.page_source
+    rates = {}
+    if table is not None:
+        for row in table.xpath("./tbody/tr"):
+            cells = row.xpath("./th|./td")
+            if len(cells) > 1:
+                maturity = _cell_text(cells[0])
+                rate = _cell_text(cells[1])
+                if "1 mois" in maturity: rates["EURIBOR 1M"] = _percent(rate)
+                elif "3 mois" in maturity: rates["EURIBOR 3M"] = _percent(rate)
+                elif "6 mois" in maturity: rates["EURIBOR 6M"] = _percent(rate)
+                elif "12 mois" in maturity: rates["EURIBOR 12M"] = _percent(rate)
+    return rates
 
-        match = re.search(r'b\.startConfig\s*=\s*({.*?});', page_source, re.DOTALL)
-        if not match: return {}
+def _fetch_euribor(source=None, timeout=15):
+    return _parse_once(EURIBOR_URL, (source or SOURCE).page(EURIBOR_URL, timeout), _parse_euribor)
 
-        config_data = json5.loads(match.group(1))
-        bootstrapped_data = config_data.get('bootstrappedData', {})
-        
-        treasury_data_key = next((key for key in bootstrapped_data if 'GT2%3AGOV' in key), None)
-        
-        if treasury_data_key:
-            field_data = bootstrapped_data[treasury_data_key].get("fieldDataCollection", [])
-            for item in field_data:
-                name = item.get("name")
-                if name == "2 Year":
-                    yields["US Treasury 2 ans"] = f"{item.get('yield', 0.0):.3f}"
-                elif name == "5 Year":
-                    yields["US Treasury 5 ans"] = f"{item.get('yield', 0.0):.3f}"
-        return yields
-    except Exception as e:
-        print(f"[ERREUR] Bloomberg: {e}")
-        return {}
-    finally:
-        driver.quit()
+def get_euribor_rates(source=None, timeout=15):
+    """Récupère les taux Euribor et les retourne dans un dictionnaire, en au plus timeout secondes."""
+    return _or_empty("Euribor", _fetch_euribor, source, timeout)
+
+def _parse_sofr(page):
+    # Premier tableau dans le premier bloc TableResponsive
+    table = _first(page, f"(//div[{_has_class('TableResponsive')}])[1]//table")
+
+    rates = {}
+    if table is not None:
+        for row in table.xpath("./tbody/tr"):
+            cells = row.xpath("./td")
+            if len(cells) >= 2:
+                maturity = _cell_text(cells[0])
+                rate = _cell_text(cells[1])
+                if "1 month" in maturity: rates["SOFR 1M"] = _percent(rate)
+                elif "3 months" in maturity: rates["SOFR 3M"] = _percent(rate)
+                elif "6 months" in maturity: rates["SOFR 6M"] = _percent(rate)
+                elif "12 months" in maturity: rates["SOFR 12M"] = _percent(rate)
+    return rates
 
-def get_tradingview_yields():
-    """Récupère les rendements des obligations allemandes."""
+def _fetch_sofr(source=None, timeout=15):
+    return _parse_once(SOFR_URL, (source or SOURCE).page(SOFR_URL, timeout), _parse_sofr)
+
+def get_sofr_rates(source=None, timeout=15):
+    """Récupère les taux SOFR et les retourne dans un dictionnaire, en au plus timeout secondes."""
+    return _or_empty("SOFR", _fetch_sofr, source, timeout)
+
+def _parse_bloomberg(page_source):
+    match = re.search(r'b\.startConfig\s*=\s*({.*?});', page_source, re.DOTALL)
+    if not match: return {}
+
+    # JSON strict dans la plupart des cas : json5, en pur Python, n'est que le recours
     try:
-        url = "https://www.tradingview.com/markets/bonds/prices-eu/"
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        data_scripts = soup.find_all("script", {"type": "application/prs.init-data+json"})
-        bonds_list = None
-        for script in data_scripts:
-            try:
-                json_data = json.loads(script.string)
-                first_key_data = list(json_data.values())[0]
-                if 'screener' in first_key_data.get('data', {}):
-                    bonds_list = first_key_data['data']['screener']['data']['data']
-                    break
-            except Exception: continue
-
-        if not bonds_list: return {}
-
-        yields = {}
-        for bond_info in bonds_list:
-            details = bond_info.get("d", [])
-            description = details[8] if len(details) > 8 else ""
-            if "Germany 2 Year" in description:
-                yields["Obligation Allemande 2 ans"] = f"{details[3]:.3f}"
-            elif "Germany 5 Year" in description:
-                yields["Obligation Allemande 5 ans"] = f"{details[3]:.3f}"
-        return yields
-    except Exception as e:
-        print(f"[ERREUR] TradingView: {e}")
-        return {}
+        config_data = json.loads(match.group(1))
+    except ValueError:
+        config_data = json5.loads(match.group(1))
+    bootstrapped_data = config_data.get('bootstrappedData', {})
+    
+    treasury_data_key = next((key for key in bootstrapped_data if 'GT2%3AGOV' in key), None)
+    
+    yields = {}
+    if treasury_data_key:
+        field_data = bootstrapped_data[treasury_data_key].get("fieldDataCollection", [])
+        for item in field_data:
+            name = item.get("name")
+            if name == "2 Year":
+                yields["Treasury Yields 2Y"] = float(item.get('yield', 0.0))
+            elif name == "5 Year":
+                yields["Treasury Yields 5Y"] = float(item.get('yield', 0.0))
+    return yields
+
+def _fetch_bloomberg(source=None, timeout=30):
+    page = (source or SOURCE).page(BLOOMBERG_URL, timeout)
+    return _parse_once(BLOOMBERG_URL, page, _parse_bloomberg)
+
+def get_bloomberg_yields(source=None, timeout=30):
+    """Récupère les rendements US Treasury (page rendue par Chrome en direct), en au plus timeout secondes."""
+    return _or_empty("Bloomberg", _fetch_bloomberg, source, timeout)
+
+# Blocs de données JSON de TradingView : seul celui du screener est décodé
+INIT_DATA_SCRIPT = re.compile(r'<script[^>]*type="application/prs\.init-data\+json"[^>]*>(.*?)</script>', re.DOTALL)
 
-def get_forex_rate():
+def _parse_tradingview(page):
+    bonds_list = None
+    for script in INIT_DATA_SCRIPT.finditer(page):
+        payload = script.group(1)
+        if '"screener"' not in payload: continue
+        try:
+            json_data = json.loads(payload)
+            first_key_data = list(json_data.values())[0]
+            if 'screener' in first_key_data.get('data', {}):
+                bonds_list = first_key_data['data']['screener']['data']['data']
+                break
+        except Exception: continue
+
+    if not bonds_list: return {}
+
+    yields = {}
+    for bond_info in bonds_list:
+        details = bond_info.get("d", [])
+        description = details[8] if len(details) > 8 else ""
+        if "Germany 2 Year" in description:
+            yields["EU Bonds 2Y"] = float(details[3])
+        elif "Germany 5 Year" in description:
+            yields["EU Bonds 5Y"] = float(details[3])
+    return yields
+
+def _fetch_tradingview(source=None, timeout=20):
+    page = (source or SOURCE).page(TRADINGVIEW_URL, timeout)
+    return _parse_once(TRADINGVIEW_URL, page, _parse_tradingview)
+
+def get_tradingview_yields(source=None, timeout=20):
+    """Récupère les rendements des obligations allemandes, en au plus timeout secondes."""
+    return _or_empty("TradingView", _fetch_tradingview, source, timeout)
+
+def _fetch_forex(source=None, timeout=10):
+    return {"Spot EUR/USD": float((source or SOURCE).exchange_rate('EUR', 'USD', timeout))}
+
+def get_forex_rate(source=None, timeout=10):
     """Récupère le taux de change EUR/USD."""
-    try:
-        c = CurrencyRates()
-        rate = c.get_rate('EUR', 'USD')
-        return {"EUR/USD Spot": f"{rate:.5f}"}
-    except Exception as e:
-        print(f"[ERREUR] Forex: {e}")
-        return {}
+    return _or_empty("Forex", _fetch_forex, source, timeout)
 
 # =============================================================================
 # FONCTION PRINCIPALE D'ORCHESTRATION
 # =============================================================================
 
-def collect_all_financial_data():
+# Collecteurs : (nom, fonction, délai maximal en secondes). Chaque fonction
+# reçoit son délai et y borne ses requêtes, nouvelles tentatives comprises.
+# Ce sont les versions qui lèvent leurs erreurs, pour que run_collection les
+# rapporte. Bloomberg compte le démarrage de Chrome au premier appel et le
+# rendu de la page.
+SCRAPERS = [
+    ("Euribor", _fetch_euribor, 15),
+    ("SOFR", _fetch_sofr, 15),
+    ("Bloomberg", _fetch_bloomberg, 30),
+    ("TradingView", _fetch_tradingview, 20),
+    ("EUR/USD", _fetch_forex, 10),
+]
+# Délai maximal de la collecte entière, en secondes
+COLLECTION_DEADLINE = float(os.environ.get("SCRAPING_DEADLINE", 40))
+
+def _timed_call(name, func, source, timeout, outcomes):
+    """Appelle func dans le thread d'une source et dépose (nom, données, erreur, durée) dans outcomes."""
+    start = time.perf_counter()
+    try:
+        data, error = func(source, timeout), None
+    except Exception as e:
+        data, error = None, e
+    outcomes.put((name, data, error, time.perf_counter() - start))
+
+def snapshot_frame(rows):
     """
-    Appelle toutes les fonctions de scraping, rassemble les données
-    et retourne un DataFrame Pandas.
+    DataFrame typé des observations : une ligne par (instrument, valeur,
+    date, source), avec la devise, la maturité en années et le type tirés
+    de INSTRUMENTS, soit les colonnes SNAPSHOT_COLUMNS de la base des taux.
+    """
+    rows = [(instrument, *INSTRUMENTS[instrument], value, as_of, source)
+            for instrument, value, as_of, source in rows if instrument in INSTRUMENTS]
+    return pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS).astype(SNAPSHOT_DTYPES)
+
+def run_collection(source=None, deadline=COLLECTION_DEADLINE, scrapers=None):
+    """
+    Lance les collecteurs en parallèle, un thread chacun : la durée totale est
+    celle de la source la plus lente, et non plus la somme des cinq. Chaque
+    source est attendue au plus son propre délai, et l'ensemble au plus
+    deadline secondes ; une source lente ou en erreur n'empêche pas de
+    renvoyer les autres. Ses requêtes étant bornées par ce même délai, son
+    thread (daemon, il ne retient pas la sortie du programme) finit peu après.
+
+    Retourne (observations, chronométrage) : le DataFrame typé de
+    snapshot_frame, dans l'ordre de SCRAPERS, daté du lancement de la
+    collecte, et un DataFrame Source / Statut / Durée (s).
+    """
+    scrapers = scrapers or SCRAPERS
+    as_of = pd.Timestamp.now().floor("s")
+    start = time.perf_counter()
+    outcomes = queue.Queue()
+    expiries = {}  # Source -> délai, en secondes depuis le lancement
+    for name, func, timeout in scrapers:
+        expiries[name] = min(timeout, deadline)
+        threading.Thread(target=_timed_call, args=(name, func, source, expiries[name], outcomes),
+                         name=f"scraper-{name}", daemon=True).start()
+    results, timings = {}, {}
+    while True:
+        now = time.perf_counter() - start
+        for name in [name for name, expiry in expiries.items() if name not in timings and expiry <= now]:
+            timings[name] = ("délai dépassé", now)
+        pending = [expiry for name, expiry in expiries.items() if name not in timings]
+        if not pending:
+            break
+        try:
+            name, data, error, elapsed = outcomes.get(timeout=min(pending) - now)
+        except queue.Empty:
+            continue
+        if name in timings:  # Arrivée après son délai
+            continue
+        if error is not None:
+            timings[name] = (f"erreur : {error}", elapsed)
+        else:
+            results[name] = data
+            timings[name] = ("ok" if data else "vide", elapsed)
+
+    observations = snapshot_frame((instrument, value, as_of, name) for name, _, _ in scrapers
+                                  for instrument, value in results.get(name, {}).items())
+    report = pd.DataFrame([{'Source': name, 'Statut': timings[name][0], 'Durée (s)': round(timings[name][1], 3)}
+                           for name, _, _ in scrapers])
+    return observations, report
+
+def collect_all_financial_data(source=None, deadline=COLLECTION_DEADLINE):
+    """
+    Appelle toutes les fonctions de scraping (en parallèle), rassemble les
+    données et retourne le DataFrame typé des observations (snapshot_frame),
+    à passer tel quel à la base des taux ou à pricing.rate_store.fx_market_data
+    pour la page FX. source remplace SOURCE (pages en direct ou rejouées).
     """
     print("Lancement de la collecte des données financières...")
-    
-    print("1/5 - Récupération des taux Euribor...")
-    euribor_data = get_euribor_rates()
-    
-    print("2/5 - Récupération des taux SOFR...")
-    sofr_data = get_sofr_rates()
-    
-    print("3/5 - Récupération des rendements US Treasury (Bloomberg)...")
-    bloomberg_data = get_bloomberg_yields()
-    
-    print("4/5 - Récupération des rendements Allemands (TradingView)...")
-    tradingview_data = get_tradingview_yields()
-
-    print("5/5 - Récupération du taux de change EUR/USD...")
-    forex_data = get_forex_rate()
-
-    print("\nCollecte terminée.")
-
-    # Fusion de toutes les données
-    all_data = {
-        **euribor_data, 
-        **sofr_data, 
-        **bloomberg_data, 
-        **tradingview_data, 
-        **forex_data
-    }
-    
-    # Transformation en DataFrame pour un affichage propre
-    if not all_data:
-        return pd.DataFrame(columns=['Indicateur', 'Valeur'])
+    start = time.perf_counter()
+    observations, report = run_collection(source, deadline)
+    wall_time = time.perf_counter() - start
 
-    table_data = [{'Indicateur': name, 'Valeur': value} for name, value in all_data.items()]
-    df = pd.DataFrame(table_data)
-    
-    return df
+    print(report.to_string(index=False))
+    print(f"\nCollecte terminée en {wall_time:.2f}s (somme des sources : {report['Durée (s)'].sum():.2f}s).")
+    return observations
 
 # =============================================================================
 # BLOC D'EXÉCUTION (si le script est lancé directement)
@@ -0,0 +1,90 @@
+"""
+Reverse-mode sensitivities (pricing.ad) against one price and against central
+bump-and-reprice (2 prices per input), with the differences to the analytic Greeks.
+
+Run from the repository root:
+    python -m benchmarks.bench_ad
+"""
+import time
+
+import numpy as np
+
+from pricing.ad import sensitivities
+from pricing.black_scholes import black_scholes_call, bs_price_and_greeks
+from pricing.lattice import _binomial_backward, lattice_sensitivities
+from pricing.monte_carlo import _pathwise_chunk_sum, monte_carlo_greeks
+from pricing.strategies import StrategyOption
+
+INPUTS = ["S", "K", "T", "r", "sigma"]
+BUMP = 1e-5
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bump_and_reprice(price, inputs, names):
+    """Central differences: two full prices per input."""
+    grad = {}
+    for name in names:
+        up, down = dict(inputs), dict(inputs)
+        up[name] = inputs[name] + BUMP
+        down[name] = inputs[name] - BUMP
+        grad[name] = (price(**up) - price(**down)) / (2 * BUMP)
+    return grad
+
+
+def report(label, price, ad, inputs, names, repeat=3):
+    t_price, _ = timed(lambda: price(**inputs), repeat)
+    t_ad, _ = timed(ad, repeat)
+    t_bump, _ = timed(lambda: bump_and_reprice(price, inputs, names), repeat)
+    print(f"{label:<34} {t_price * 1e3:>9.2f}ms {t_ad * 1e3:>9.2f}ms ({t_ad / t_price:>4.1f}x) "
+          f"{t_bump * 1e3:>9.2f}ms ({t_bump / t_price:>4.1f}x)")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    contracts = dict(S=rng.uniform(50, 150, n), K=rng.uniform(50, 150, n), T=rng.uniform(0.05, 2.0, n),
+                     r=np.full(n, 0.03), sigma=rng.uniform(0.05, 0.8, n))
+    legs = [StrategyOption("call", 100, 5, 1, "long"), StrategyOption("put", 90, 2, 2, "short")]
+    mc_paths, mc_seed = 200_000, np.random.SeedSequence(0)
+
+    def mc_price(S, T, r, sigma):
+        return _pathwise_chunk_sum(legs, S, T, r, sigma, "european", mc_paths, 1, True, mc_seed) / mc_paths
+
+    def tree_price(S, K, T, r, sigma):
+        return _binomial_backward(S, K, T, r, sigma, -1.0, True, 500)
+
+    print(f"{'':<34} {'price':>11} {'all sensitivities':>18} {'bump-and-reprice':>18}")
+    report(f"Black-Scholes call, {n:,} contracts", black_scholes_call,
+           lambda: sensitivities(black_scholes_call, INPUTS, **contracts), contracts, INPUTS)
+    mc_inputs = dict(S=100.0, T=0.5, r=0.03, sigma=0.2)
+    report(f"Monte Carlo strategy, {mc_paths:,} paths", mc_price,
+           lambda: sensitivities(mc_price, list(mc_inputs), **mc_inputs), mc_inputs, list(mc_inputs))
+    tree_inputs = dict(S=100.0, K=105.0, T=0.75, r=0.03, sigma=0.25)
+    report("American put, 500-step tree", tree_price,
+           lambda: lattice_sensitivities(**tree_inputs, option_type="put", steps=500), tree_inputs, INPUTS, repeat=1)
+
+    print("\nMax abs difference to the analytic Greeks (Black-Scholes call)")
+    _, grad = sensitivities(black_scholes_call, INPUTS, **contracts)
+    exact = bs_price_and_greeks(contracts["S"], contracts["K"], contracts["T"], contracts["r"], contracts["sigma"])
+    for label, ad_value, analytic in [("delta", grad["S"], exact.delta), ("theta", -grad["T"], exact.theta),
+                                      ("vega", grad["sigma"] / 100, exact.vega), ("rho", grad["r"] / 100, exact.rho)]:
+        print(f"  {label:>6}: {np.max(np.abs(ad_value - analytic)):.1e}")
+
+    print("\nMonte Carlo pathwise Greeks of the strategy against the analytic values")
+    mc = monte_carlo_greeks(legs, 100.0, 0.5, 0.03, 0.2, n_paths=mc_paths)
+    for name in ["price", "delta", "theta", "vega", "rho"]:
+        analytic = sum((1 if leg.position == "long" else -1) * leg.quantity *
+                       getattr(bs_price_and_greeks(100.0, leg.strike, 0.5, 0.03, 0.2, leg.type), name) for leg in legs)
+        print(f"  {name:>6}: {mc[name]:>9.5f}  analytic {analytic:>9.5f}")
+
+
+if __name__ == "__main__":
+    main()
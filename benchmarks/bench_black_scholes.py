@@ -0,0 +1,55 @@
+"""
+Fused price-and-Greeks evaluation against the separate Black-Scholes functions,
+and the extra cost of the higher-order Greeks in the same pass.
+
+Run from the repository root:
+    python -m benchmarks.bench_black_scholes
+"""
+import timeit
+
+import numpy as np
+
+from pricing.black_scholes import (
+    bs_call_price, delta_call, gamma, theta_call, vega, rho_call, bs_price_and_greeks
+)
+
+
+def separate(S, K, T, r, sigma):
+    return (bs_call_price(S, K, T, r, sigma), delta_call(S, K, T, r, sigma), gamma(S, K, T, r, sigma),
+            theta_call(S, K, T, r, sigma), vega(S, K, T, r, sigma), rho_call(S, K, T, r, sigma))
+
+
+def fused(S, K, T, r, sigma):
+    return bs_price_and_greeks(S, K, T, r, sigma, "call")
+
+
+def fused_higher_order(S, K, T, r, sigma):
+    return bs_price_and_greeks(S, K, T, r, sigma, "call", higher_order=True)
+
+
+def best_times(funcs, *args, rounds=7):
+    """Best time per call of each function, timed in alternation so machine noise hits them all alike."""
+    timers = [timeit.Timer(lambda func=func: func(*args)) for func in funcs]
+    numbers = [timer.autorange()[0] for timer in timers]
+    best = [float("inf")] * len(funcs)
+    for _ in range(rounds):
+        for i, (timer, number) in enumerate(zip(timers, numbers)):
+            best[i] = min(best[i], timer.timeit(number=number) / number)
+    return best
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'n':>10} {'separate':>12} {'fused':>12} {'speedup':>8} {'+ higher':>12} {'extra':>8}")
+    for n in [1, 100, 10_000, 1_000_000]:
+        S = rng.uniform(50, 150, n)
+        K = rng.uniform(50, 150, n)
+        T = rng.uniform(0.01, 2.0, n)
+        sigma = rng.uniform(0.05, 0.8, n)
+        t_sep, t_fused, t_higher = best_times([separate, fused, fused_higher_order], S, K, T, 0.02, sigma)
+        print(f"{n:>10} {t_sep * 1e6:>10.1f}us {t_fused * 1e6:>10.1f}us {t_sep / t_fused:>7.1f}x "
+              f"{t_higher * 1e6:>10.1f}us {(t_higher / t_fused - 1) * 100:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Table-driven Black-Scholes (pricing.lookup) against the closed-form kernel:
+build and load times, query timings, and an accuracy report.
+
+Run from the repository root:
+    python -m benchmarks.bench_lookup
+"""
+import os
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+from pricing.black_scholes import bs_price_and_greeks
+from pricing.lookup import (LOOKUP_FIELDS, LOOKUP_METHODS, build_lookup_table, load_lookup_table,
+                            lookup_price_and_greeks, save_lookup_table)
+
+GREEKS = ["price", "delta", "gamma", "theta", "vega", "rho"]
+
+
+def best_time(func, *args, repeat=3):
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def random_contracts(rng, n):
+    """Strikes from 40 to 250 on a spot of 100, one day to three years, 5% to 100% volatility."""
+    return (100.0, rng.uniform(40, 250, n), rng.uniform(1 / 365, 3, n), 0.03,
+            rng.uniform(0.05, 1.0, n), rng.choice(["call", "put"], n))
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    table = build_lookup_table()
+    print(f"Build: {time.perf_counter() - start:.3f}s, {table.shape[0]} x {table.shape[1]} nodes, "
+          f"{table.nbytes / 1e6:.1f} MB float32")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bs_table")
+        save_lookup_table(table, path)
+        start = time.perf_counter()
+        mapped = load_lookup_table(path)
+        print(f"Memory-mapped load: {(time.perf_counter() - start) * 1e3:.2f}ms")
+        contracts = random_contracts(rng, 1_000)
+        assert np.array_equal(lookup_price_and_greeks(mapped, *contracts).price,
+                              lookup_price_and_greeks(table, *contracts).price)
+        del mapped
+
+    print("\nQuery time (price and all Greeks)")
+    print(f"{'n':>10} {'analytic':>12} {'linear':>12} {'cubic':>12}")
+    for n in [1, 100, 10_000, 1_000_000]:
+        contracts = random_contracts(rng, n)
+        repeat = 1 if n > 100_000 else 3
+        times = [best_time(bs_price_and_greeks, *contracts, repeat=repeat)]
+        times += [best_time(lookup_price_and_greeks, table, *contracts, method, repeat=repeat) for method in LOOKUP_METHODS]
+        print(f"{n:>10} " + " ".join(f"{t * 1e6:>10.1f}us" for t in times))
+
+    print("\nError bound stored with the table (largest field error at the cell centres)")
+    for method in LOOKUP_METHODS:
+        print(f"  {method:>6}: " + "  ".join(f"{field} {table.error_bound[method][field]:.1e}" for field in LOOKUP_FIELDS))
+
+    print("\nAccuracy report: max abs error against the closed form on 1,000,000 random contracts (spot 100)")
+    contracts = random_contracts(rng, 1_000_000)
+    exact = bs_price_and_greeks(*contracts)
+    print(f"{'':>8} " + " ".join(f"{name:>10}" for name in GREEKS))
+    for method in LOOKUP_METHODS:
+        approx = lookup_price_and_greeks(table, *contracts, method=method)
+        errors = [np.max(np.abs(getattr(approx, name) - getattr(exact, name))) for name in GREEKS]
+        print(f"{method:>8} " + " ".join(f"{error:>10.1e}" for error in errors))
+
+
+if __name__ == "__main__":
+    main()
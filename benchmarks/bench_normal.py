@@ -0,0 +1,49 @@
+"""
+Normal CDF/PDF: pricing.normal against the scipy.stats.norm calls it replaces.
+
+Run from the repository root:
+    python -m benchmarks.bench_normal
+"""
+import timeit
+
+import numpy as np
+import scipy.stats as si
+
+from pricing.normal import norm_cdf, norm_pdf, norm_cdf_scalar, norm_pdf_scalar
+
+
+def best_time(func, *args, repeat=3):
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("Scalar inputs (one Python float per call)")
+    x = 0.37
+    for label, fast, slow in [("cdf", norm_cdf_scalar, si.norm.cdf), ("pdf", norm_pdf_scalar, si.norm.pdf)]:
+        t_slow, t_fast = best_time(slow, x), best_time(fast, x)
+        print(f"  {label}: scipy.stats {t_slow * 1e6:8.2f}us  pricing.normal {t_fast * 1e6:8.3f}us  {t_slow / t_fast:6.1f}x")
+
+    print("\nArray inputs")
+    print(f"{'n':>10} {'cdf scipy':>12} {'cdf fast':>12} {'speedup':>8} {'pdf scipy':>12} {'pdf fast':>12} {'speedup':>8}")
+    for n in [1, 10, 1_000, 100_000, 10_000_000]:
+        x = rng.normal(0, 3, n)
+        row = [f"{n:>10}"]
+        for fast, slow in [(norm_cdf, si.norm.cdf), (norm_pdf, si.norm.pdf)]:
+            t_slow, t_fast = best_time(slow, x, repeat=1 if n > 1e6 else 3), best_time(fast, x, repeat=1 if n > 1e6 else 3)
+            row.append(f"{t_slow * 1e6:>10.1f}us {t_fast * 1e6:>10.1f}us {t_slow / t_fast:>7.1f}x")
+        print(" ".join(row))
+
+    print("\nAccuracy against scipy.stats.norm on [-40, 40]")
+    x = np.linspace(-40, 40, 1_000_001)
+    print(f"  cdf max abs error: {np.max(np.abs(norm_cdf(x) - si.norm.cdf(x))):.3e}")
+    print(f"  pdf max abs error: {np.max(np.abs(norm_pdf(x) - si.norm.pdf(x))):.3e}")
+    scalar_cdf = np.array([norm_cdf_scalar(v) for v in x[::100]])
+    print(f"  scalar cdf max abs error: {np.max(np.abs(scalar_cdf - si.norm.cdf(x[::100]))):.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Page parsing of the scrapers: targeted lxml extraction (Scraping._parse_*)
+against the former BeautifulSoup html.parser versions kept below, on saved
+pages (synthetic fixtures by default, or a folder written by
+Scraping.record_pages). Both must extract the same values.
+
+Run from the repository root:
+    python -m benchmarks.bench_parsing [--fixtures FOLDER]
+"""
+import argparse
+import json
+import re
+import tempfile
+import timeit
+from pathlib import Path
+
+import json5
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import write_page_fixtures
+from Scraping import (
+    BLOOMBERG_URL, EURIBOR_URL, SOFR_URL, TRADINGVIEW_URL, _parse_bloomberg, _parse_euribor, _parse_sofr,
+    _parse_tradingview, fixture_name,
+)
+
+
+# The parsers as they were, BeautifulSoup's html.parser over the whole page
+
+def former_euribor(page):
+    soup = BeautifulSoup(page, "html.parser")
+    table = soup.find("table", class_="table-striped")
+    rates = {}
+    if table:
+        for row in table.find("tbody").find_all("tr"):
+            cells = row.find_all(['th', 'td'])
+            if len(cells) > 1:
+                maturity = cells[0].get_text(strip=True)
+                rate = cells[1].get_text(strip=True).replace('%', '').strip()
+                if "1 mois" in maturity: rates["Euribor 1 Mois"] = rate
+                elif "3 mois" in maturity: rates["Euribor 3 Mois"] = rate
+                elif "6 mois" in maturity: rates["Euribor 6 Mois"] = rate
+                elif "12 mois" in maturity: rates["Euribor 12 Mois"] = rate
+    return rates
+
+
+def former_sofr(page):
+    soup = BeautifulSoup(page, "html.parser")
+    table_container = soup.find("div", class_="TableResponsive")
+    table = table_container.find("table") if table_container else None
+    rates = {}
+    if table:
+        for row in table.find("tbody").find_all("tr"):
+            cells = row.find_all("td")
+            if len(cells) >= 2:
+                maturity = cells[0].get_text(strip=True)
+                rate = cells[1].get_text(strip=True).replace('%', '').strip()
+                if "1 month" in maturity: rates["SOFR 1 Mois"] = rate
+                elif "3 months" in maturity: rates["SOFR 3 Mois"] = rate
+                elif "6 months" in maturity: rates["SOFR 6 Mois"] = rate
+                elif "12 months" in maturity: rates["SOFR 12 Mois"] = rate
+    return rates
+
+
+def former_bloomberg(page_source):
+    yields = {}
+    match = re.search(r'b\.startConfig\s*=\s*({.*?});', page_source, re.DOTALL)
+    if not match: return {}
+    config_data = json5.loads(match.group(1))
+    bootstrapped_data = config_data.get('bootstrappedData', {})
+    treasury_data_key = next((key for key in bootstrapped_data if 'GT2%3AGOV' in key), None)
+    if treasury_data_key:
+        field_data = bootstrapped_data[treasury_data_key].get("fieldDataCollection", [])
+        for item in field_data:
+            name = item.get("name")
+            if name == "2 Year":
+                yields["US Treasury 2 ans"] = f"{item.get('yield', 0.0):.3f}"
+            elif name == "5 Year":
+                yields["US Treasury 5 ans"] = f"{item.get('yield', 0.0):.3f}"
+    return yields
+
+
+def former_tradingview(page):
+    soup = BeautifulSoup(page, "html.parser")
+    data_scripts = soup.find_all("script", {"type": "application/prs.init-data+json"})
+    bonds_list = None
+    for script in data_scripts:
+        try:
+            json_data = json.loads(script.string)
+            first_key_data = list(json_data.values())[0]
+            if 'screener' in first_key_data.get('data', {}):
+                bonds_list = first_key_data['data']['screener']['data']['data']
+                break
+        except Exception: continue
+    if not bonds_list: return {}
+    yields = {}
+    for bond_info in bonds_list:
+        details = bond_info.get("d", [])
+        description = details[8] if len(details) > 8 else ""
+        if "Germany 2 Year" in description:
+            yields["Obligation Allemande 2 ans"] = f"{details[3]:.3f}"
+        elif "Germany 5 Year" in description:
+            yields["Obligation Allemande 5 ans"] = f"{details[3]:.3f}"
+    return yields
+
+
+# Labels of the former parsers, whose values were formatted strings
+FORMER_LABELS = {
+    "Euribor 1 Mois": "EURIBOR 1M", "Euribor 3 Mois": "EURIBOR 3M", "Euribor 6 Mois": "EURIBOR 6M",
+    "Euribor 12 Mois": "EURIBOR 12M", "SOFR 1 Mois": "SOFR 1M", "SOFR 3 Mois": "SOFR 3M", "SOFR 6 Mois": "SOFR 6M",
+    "SOFR 12 Mois": "SOFR 12M", "US Treasury 2 ans": "Treasury Yields 2Y", "US Treasury 5 ans": "Treasury Yields 5Y",
+    "Obligation Allemande 2 ans": "EU Bonds 2Y", "Obligation Allemande 5 ans": "EU Bonds 5Y",
+}
+
+
+def same_values(former, typed):
+    """The former strings (rounded to 3 decimals for the yields) against the typed values."""
+    former = {FORMER_LABELS[label]: float(text.replace(",", ".")) for label, text in former.items()}
+    return former.keys() == typed.keys() and all(abs(former[name] - typed[name]) <= 5e-4 for name in typed)
+
+
+PARSERS = [
+    ("Euribor", EURIBOR_URL, former_euribor, _parse_euribor),
+    ("SOFR", SOFR_URL, former_sofr, _parse_sofr),
+    ("Bloomberg", BLOOMBERG_URL, former_bloomberg, _parse_bloomberg),
+    ("TradingView", TRADINGVIEW_URL, former_tradingview, _parse_tradingview),
+]
+
+
+def best_time(func, *args, repeat=3):
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def run(folder):
+    print(f"{'page':<12} {'size':>9} {'former':>11} {'lxml':>11} {'speedup':>8}")
+    for name, url, former, targeted in PARSERS:
+        page = (Path(folder) / "pages" / fixture_name(url)).read_text(encoding="utf-8")
+        assert same_values(former(page), targeted(page)), f"{name}: the parsers disagree"
+        t_former, t_targeted = best_time(former, page), best_time(targeted, page)
+        print(f"{name:<12} {len(page) / 1e3:>7.0f}KB {t_former * 1e3:>9.2f}ms {t_targeted * 1e3:>9.3f}ms "
+              f"{t_former / t_targeted:>7.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the page parsers on saved pages.")
+    parser.add_argument("--fixtures", help="Folder with pages/ (Scraping.record_pages); synthetic pages otherwise")
+    args = parser.parse_args()
+    if args.fixtures:
+        run(args.fixtures)
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        write_page_fixtures(folder)
+        run(folder)
+
+
+if __name__ == "__main__":
+    main()
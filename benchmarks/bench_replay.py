@@ -0,0 +1,83 @@
+"""
+Pricing, volatility and scraping pipelines timed on replayed data: the same
+synthetic fixtures read from a folder and through the local fixture server,
+so that every run sees identical inputs and no network.
+
+Run from the repository root:
+    python -m benchmarks.bench_replay [--tickers 200] [--latency 0.05]
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fixture_server import serve
+from benchmarks.fixtures import write_market_fixtures, write_page_fixtures
+from pricing.black_scholes import bs_price_and_greeks
+from pricing.market_data import MarketDataCache
+from pricing.providers import ReplayProvider
+from pricing.volatility import universe_volatility
+from Scraping import ReplaySource, collect_all_financial_data
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def pricing_pipeline(location, tickers, folder):
+    """Universe volatility, then every ticker's 1-year history priced as an ATM chain."""
+    cache = MarketDataCache(folder, provider=ReplayProvider(location))
+    table = universe_volatility(tickers, cache=cache)
+    sigma = table[(table["estimator"] == "yang_zhang") & (table["window"] == 40)].set_index("ticker")["volatility"]
+    histories = cache.histories(tickers, period="1y")
+    spots = np.array([histories[ticker]["Close"].iloc[-1] for ticker in sigma.index])
+    strikes = spots[:, None] * np.linspace(0.8, 1.2, 41)
+    greeks = bs_price_and_greeks(spots[:, None], strikes, 30 / 365, 0.04, sigma.to_numpy()[:, None])
+    return cache, float(greeks.price.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the pipelines on replayed data.")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every server response")
+    args = parser.parse_args()
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+
+    with tempfile.TemporaryDirectory() as fixtures, tempfile.TemporaryDirectory() as caches:
+        elapsed, _ = timed(lambda: (write_market_fixtures(fixtures, tickers), write_page_fixtures(fixtures)))
+        print(f"Fixtures for {len(tickers)} tickers written in {elapsed:.2f}s")
+        server, url = serve(fixtures, latency=args.latency)
+        try:
+            print(f"\n{'':<44} {'folder':>10} {'HTTP':>10}")
+            results = {}
+            for run in ["cold", "warm"]:
+                times = []
+                for name, location in [("folder", fixtures), ("http", url)]:
+                    # The cold run downloads every history from the replay; the warm one reads the Parquet tier it left
+                    cache_folder = f"{caches}/{name}"
+                    elapsed, (_, total) = timed(lambda: pricing_pipeline(location, tickers, cache_folder))
+                    results[name] = total
+                    times.append(elapsed)
+                print(f"{f'Volatility + pricing, {run} disk cache':<44} " + " ".join(f"{t:>9.3f}s" for t in times))
+            assert results["folder"] == results["http"], "Folder and HTTP replays disagree"
+
+            times, tables = [], []
+            for location in [fixtures, url]:
+                with contextlib.redirect_stdout(io.StringIO()):  # The scraper's progress messages
+                    elapsed, table = timed(lambda: collect_all_financial_data(ReplaySource(location)))
+                times.append(elapsed)
+                tables.append(table.drop(columns="as_of"))  # Time of each run
+            print(f"{'Scraping (4 pages + EUR/USD)':<44} " + " ".join(f"{t:>9.3f}s" for t in times))
+            assert tables[0].equals(tables[1]), "Folder and HTTP replays disagree"
+            print("\n" + tables[0].to_string(index=False))
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
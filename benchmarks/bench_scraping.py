@@ -0,0 +1,122 @@
+"""
+Scraping.collect_all_financial_data against the fixture server, each page
+delayed to imitate the remote sites: the five sources one after the other,
+then concurrently (wall time close to the slowest source), then with one
+site stalled past its timeout (partial results returned on time, the stalled
+request abandoned within the same timeout). The pooled, conditional HTTP
+client is then compared with one plain GET per page on a scheduled refresh
+where no page changed.
+
+Run from the repository root:
+    python -m benchmarks.bench_scraping [--latency 0.5] [--stall 5]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.fixture_server import serve
+from benchmarks.fixtures import write_page_fixtures
+from Scraping import HEADERS, SCRAPERS, TRADINGVIEW_URL, ReplaySource, fixture_name, run_collection
+
+
+class PlainSource(ReplaySource):
+    """The former client: a new connection and a full download for every page, every page parsed."""
+
+    reads = itertools.count()
+
+    def _read(self, name, timeout=10):
+        response = requests.get(f"{self.location}/pages/{name}", headers=HEADERS, timeout=timeout)
+        response.raise_for_status()
+        if not name.endswith(".html"):
+            return response.text
+        return response.text + f"<!-- {next(self.reads)} -->"  # Never the text parsed last time
+
+
+def values(observations):
+    return dict(zip(observations["instrument"], observations["value"]))
+
+
+def sequential(source):
+    """The former behaviour: every scraper in turn."""
+    data = {}
+    for _, func, _ in SCRAPERS:
+        data.update(func(source))
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the scrapers, sequential and concurrent.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds added to every page")
+    parser.add_argument("--stall", type=float, default=5.0, help="Delay of the stalled page (above its timeout)")
+    parser.add_argument("--refreshes", type=int, default=20, help="Refreshes timed without latency")
+    args = parser.parse_args()
+    # Different delays per site, the slowest one dominating the concurrent run
+    delays = {"euribor": 0.2, "sofr": 0.4, "bloomberg": 1.0, "tradingview": 0.6}
+
+    with tempfile.TemporaryDirectory() as fixtures:
+        write_page_fixtures(fixtures)
+        server, url = serve(fixtures, latency=args.latency, delays=delays)
+        stalled, stalled_url = serve(fixtures, latency=args.latency,
+                                     delays={**delays, fixture_name(TRADINGVIEW_URL): args.stall})
+        try:
+            source = ReplaySource(url)
+            with contextlib.redirect_stdout(io.StringIO()):  # The scrapers' error messages
+                start = time.perf_counter()
+                reference = sequential(source)
+                sequential_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                data, report = run_collection(source)
+                concurrent_time = time.perf_counter() - start
+
+                # TradingView stalls past a 2 s timeout (the other sources keep theirs)
+                scrapers = [(name, func, 2.0 if name == "TradingView" else timeout) for name, func, timeout in SCRAPERS]
+                start = time.perf_counter()
+                partial, partial_report = run_collection(ReplaySource(stalled_url), scrapers=scrapers)
+                partial_time = time.perf_counter() - start
+                # The abandoned TradingView request is bounded by the same 2 s: its thread ends right after
+                start = time.perf_counter()
+                for thread in threading.enumerate():
+                    if thread.name.startswith("scraper-"):
+                        thread.join()
+                straggler_time = time.perf_counter() - start
+            assert values(data) == reference, "Sequential and concurrent runs disagree"
+
+            print(f"{'Sequential':<36} {sequential_time:>8.3f}s")
+            print(f"{'Concurrent':<36} {concurrent_time:>8.3f}s   slowest source {report['Durée (s)'].max():.3f}s")
+            print(f"{'Concurrent, TradingView stalled':<36} {partial_time:>8.3f}s   "
+                  f"{len(partial)}/{len(reference)} indicators, abandoned thread ended {straggler_time:.3f}s later")
+            print("\n" + report.to_string(index=False))
+            print("\n" + partial_report.to_string(index=False))
+        finally:
+            server.shutdown()
+            stalled.shutdown()
+
+        # Refreshes without latency: what is left is connections, transfers and parsing
+        server, url = serve(fixtures)
+        try:
+            print()
+            for label, make_source in [("Refresh, plain GET per page", lambda: PlainSource(url)),
+                                       ("Refresh, pooled + conditional GET", lambda: ReplaySource(url))]:
+                source = make_source()
+                run_collection(source)  # First download: every page is new
+                start = time.perf_counter()
+                for _ in range(args.refreshes):
+                    data, _ = run_collection(source)
+                elapsed = (time.perf_counter() - start) / args.refreshes
+                assert values(data) == reference, "Refreshes disagree"
+                detail = ("" if isinstance(source, PlainSource)
+                          else f"{source.http.not_modified} x 304, {source.http.downloads} x 200")
+                print(f"{label:<36} {elapsed * 1000:>8.1f}ms   {detail}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
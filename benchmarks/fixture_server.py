@@ -0,0 +1,60 @@
+"""
+Local HTTP server standing in for the market data and scraping endpoints: it
+serves a fixtures folder (ohlcv/ and pages/, see benchmarks/fixtures.py) so
+that ReplayProvider and Scraping.ReplaySource can be pointed at
+http://127.0.0.1:<port> and pipelines timed with real HTTP round trips, but
+no network. --latency adds a fixed delay to every response, to imitate the
+remote sites; delays adds more to the paths containing a given fragment
+(one slow site among several). Connections are kept alive (HTTP/1.1) and
+If-Modified-Since is answered with 304, as on the real sites.
+
+Run from the repository root:
+    python -m benchmarks.fixture_server FOLDER [--port 8765] [--latency 0.2]
+"""
+import argparse
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    delays = {}  # path fragment -> extra seconds
+
+    def do_GET(self):
+        delay = self.latency + sum(seconds for fragment, seconds in self.delays.items() if fragment in self.path)
+        if delay:
+            time.sleep(delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(folder, port=0, latency=0.0, delays=None):
+    """Starts the server in a daemon thread; returns it with its base URL (server.shutdown() stops it)."""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency, "delays": dict(delays or {})})
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(handler, directory=str(folder)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves a fixtures folder over HTTP.")
+    parser.add_argument("folder")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+    server, url = serve(args.folder, args.port, args.latency)
+    print(f"Serving {args.folder} on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Synthetic fixtures in the layout read by ReplayProvider (pricing.providers)
+and Scraping.ReplaySource, for benchmarks that must not touch the network:
+
+    <folder>/ohlcv/<TICKER>_1d.csv, manifest.json   seeded daily OHLCV bars
+    <folder>/pages/<page>.html, exchange_rates.json  pages shaped like the scraped sites
+
+Recorded fixtures (record_histories, Scraping.record_pages) can be used in
+their place. The pages carry padding markup so that their sizes are close to
+those of the real sites.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from Scraping import BLOOMBERG_URL, EURIBOR_URL, SOFR_URL, TRADINGVIEW_URL, fixture_name
+
+AS_OF = pd.Timestamp("2025-08-01 16:00:00")
+PAGE_SIZES = {EURIBOR_URL: 150_000, SOFR_URL: 120_000, BLOOMBERG_URL: 1_500_000, TRADINGVIEW_URL: 800_000}
+
+
+def write_market_fixtures(folder, tickers, years=5, seed=0, as_of=AS_OF):
+    """Daily bars from a geometric Brownian motion per ticker, with a random walk intraday for the ranges."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(as_of.normalize() - pd.DateOffset(years=years), as_of.normalize(), name="Date")
+    ohlcv = Path(folder) / "ohlcv"
+    ohlcv.mkdir(parents=True, exist_ok=True)
+    for ticker in tickers:
+        sigma = rng.uniform(0.15, 0.6)
+        steps = rng.standard_normal((len(dates), 16)) * sigma / np.sqrt(252 * 16)
+        path = rng.uniform(20, 500) * np.exp(np.cumsum(steps.ravel())).reshape(steps.shape)
+        gap = np.exp(rng.standard_normal(len(dates)) * sigma / np.sqrt(252) / 4)  # Overnight moves
+        open_ = path[:, 0] * gap
+        frame = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(path.max(axis=1), open_),
+            "Low": np.minimum(path.min(axis=1), open_),
+            "Close": path[:, -1],
+            "Volume": rng.integers(100_000, 10_000_000, len(dates)),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=dates)
+        frame.to_csv(ohlcv / f"{ticker}_1d.csv")
+    manifest = {"as_of": f"{as_of:%Y-%m-%d %H:%M:%S}", "interval": "1d", "tickers": sorted(tickers)}
+    (ohlcv / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+def _padding(size, seed):
+    """Unrelated markup (navigation lists, inline scripts) of roughly size characters."""
+    rng = np.random.default_rng(seed)
+    blocks, total = [], 0
+    while total < size:
+        words = " ".join(f"item{n}" for n in rng.integers(0, 10_000, 20))
+        block = (f'<div class="nav-{total}"><ul>' + "".join(f'<li><a href="/p/{n}">{words}</a></li>' for n in range(8))
+                 + f'</ul></div><script>window.__chunk_{total} = {json.dumps({"k": words, "v": list(range(30))})};</script>\n')
+        blocks.append(block)
+        total += len(block)
+    return "".join(blocks)
+
+def _page(body, size, seed):
+    padding = _padding(max(0, size - len(body)), seed)
+    half = len(padding) // 2
+    return f"<!DOCTYPE html><html><head><title>fixture</title></head><body>{padding[:half]}{body}{padding[half:]}</body></html>"
+
+def _euribor():
+    rows = "".join(f"<tr><th>Euribor {label}</th><td>{rate} %</td></tr>"
+                   for label, rate in [("1 semaine", "1,912"), ("1 mois", "1,889"), ("3 mois", "2,006"),
+                                       ("6 mois", "2,082"), ("12 mois", "2,141")])
+    return f'<table class="table table-striped"><thead><tr><th>Échéance</th><th>Taux</th></tr></thead><tbody>{rows}</tbody></table>'
+
+def _sofr():
+    rows = "".join(f"<tr><td>CME Term SOFR - {label}</td><td>{rate} %</td></tr>"
+                   for label, rate in [("1 month", "4.34680"), ("3 months", "4.31256"),
+                                       ("6 months", "4.23198"), ("12 months", "4.05021")])
+    return f'<div class="TableResponsive"><table><thead><tr><th>Maturity</th><th>Rate</th></tr></thead><tbody>{rows}</tbody></table></div>'
+
+def _bloomberg():
+    collection = [{"name": name, "yield": value, "price": 99.5} for name, value in
+                  [("3 Month", 4.341), ("2 Year", 3.958), ("5 Year", 3.969), ("10 Year", 4.389), ("30 Year", 4.921)]]
+    config = {"pageName": "rates", "bootstrappedData": {
+        "/markets2/api/comparison/data?securities=GT2%3AGOV,GT5%3AGOV": {"fieldDataCollection": collection},
+        "/markets2/api/other": {"fieldDataCollection": []}}}
+    return f"<script>window.b = window.b || {{}}; b.startConfig = {json.dumps(config)};</script>"
+
+def _tradingview():
+    bonds = [{"s": f"TVC:{code}", "d": [code, 0, 0, value, 0, 0, 0, 0, description]} for code, value, description in
+             [("DE02Y", 1.945, "Germany 2 Year Government Bonds Yield"),
+              ("DE05Y", 2.246, "Germany 5 Year Government Bonds Yield"),
+              ("FR10Y", 3.301, "France 10 Year Government Bonds Yield")]]
+    other = {"k1": {"data": {"news": []}}}
+    data = {"k2": {"data": {"screener": {"data": {"data": bonds}}}}}
+    return "".join(f'<script type="application/prs.init-data+json">{json.dumps(payload)}</script>' for payload in (other, data))
+
+def write_page_fixtures(folder, seed=0):
+    """The four scraped pages and the EUR/USD rate, shaped like the live sites."""
+    pages = Path(folder) / "pages"
+    pages.mkdir(parents=True, exist_ok=True)
+    bodies = {EURIBOR_URL: _euribor(), SOFR_URL: _sofr(), BLOOMBERG_URL: _bloomberg(), TRADINGVIEW_URL: _tradingview()}
+    for i, (url, body) in enumerate(bodies.items()):
+        (pages / fixture_name(url)).write_text(_page(body, PAGE_SIZES[url], seed + i), encoding="utf-8")
+    (pages / "exchange_rates.json").write_text(json.dumps({"EUR/USD": 1.14155}))
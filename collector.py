@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Collecteur en continu : lance les fonctions de Scraping.py à intervalles
+réguliers et ajoute leurs observations typées à la base des taux
+(pricing/rate_store.py) que lit la page FX. Chaque source a son propre
+intervalle ; les sources dues au même moment sont collectées en parallèle.
+
+    python collector.py                                      # en continu
+    python collector.py --once                               # une collecte, puis sortie
+    python collector.py --interval Bloomberg=3600 --interval EUR/USD=60
+    python collector.py --once --replay http://127.0.0.1:8000  # pages enregistrées
+"""
+
+import argparse
+import heapq
+import os
+import time
+
+import pandas as pd
+
+from pricing.rate_store import RATE_STORE
+from Scraping import SCRAPERS, ReplaySource, run_collection
+
+# Intervalle par défaut entre deux collectes d'une même source, en secondes
+DEFAULT_INTERVAL = float(os.environ.get("COLLECTOR_INTERVAL", 15 * 60))
+
+def collect(names, store=RATE_STORE, source=None):
+    """Une collecte des sources names, ajoutée à store ; retourne le nombre d'observations."""
+    observations, report = run_collection(source, scrapers=[scraper for scraper in SCRAPERS if scraper[0] in names])
+    added = store.append(observations)
+    statuses = ", ".join(f"{name} {status} ({seconds:.1f}s)" for name, status, seconds in report.itertuples(index=False))
+    print(f"[{pd.Timestamp.now():%Y-%m-%d %H:%M:%S}] {added} observations ; {statuses}")
+    return added
+
+def run(intervals, store=RATE_STORE, once=False, source=None):
+    """
+    Collecte chaque source toutes les intervals[source] secondes, jusqu'à
+    Ctrl+C. Une collecte en retard n'est pas rattrapée : la suivante est
+    planifiée à partir de l'heure où elle a eu lieu. source est celle de
+    run_collection (les sites par défaut).
+    """
+    queue = [(0.0, name) for name in intervals]  # (prochaine collecte, source)
+    heapq.heapify(queue)
+    while queue:
+        now = time.monotonic()
+        due = []
+        while queue and queue[0][0] <= now:
+            due.append(heapq.heappop(queue)[1])
+        if due:
+            try:
+                collect(due, store, source)
+            except Exception as e:  # Le collecteur ne s'arrête pas sur une collecte ratée
+                print(f"[ERREUR] Collecte {', '.join(due)}: {e}")
+            if once:
+                return
+            for name in due:
+                heapq.heappush(queue, (time.monotonic() + intervals[name], name))
+        time.sleep(max(0.0, queue[0][0] - time.monotonic()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Collecte les taux à intervalles réguliers dans la base des taux.")
+    parser.add_argument("--once", action="store_true", help="Une seule collecte de toutes les sources")
+    parser.add_argument("--interval", action="append", default=[], metavar="SOURCE=SECONDES",
+                        help=f"Intervalle d'une source ({', '.join(name for name, _, _ in SCRAPERS)})")
+    parser.add_argument("--replay", metavar="DOSSIER_OU_URL",
+                        help="Collecte des pages enregistrées (ReplaySource) au lieu des sites")
+    args = parser.parse_args()
+
+    intervals = {name: DEFAULT_INTERVAL for name, _, _ in SCRAPERS}
+    for setting in args.interval:
+        name, _, seconds = setting.partition("=")
+        if name not in intervals:
+            parser.error(f"Source inconnue : {name}")
+        try:
+            intervals[name] = float(seconds)
+        except ValueError:
+            parser.error(f"Intervalle invalide pour {name} : {seconds!r} (attendu SOURCE=SECONDES)")
+        if not intervals[name] > 0:  # Écarte aussi nan
+            parser.error(f"L'intervalle de {name} doit être positif : {seconds}")
+
+    print(f"Collecte vers {RATE_STORE.path} (Ctrl+C pour arrêter)")
+    try:
+        run(intervals, once=args.once, source=ReplaySource(args.replay) if args.replay else None)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
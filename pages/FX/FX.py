@@ -7,6 +7,8 @@ from datetime import datetime, timedelta
 import math
 from scipy.interpolate import interp1d
 
+from pricing.rate_store import RATE_STORE, fx_market_data
+
 
 # Utility Functions
 @st.cache_data
@@ -53,6 +55,25 @@ def get_initial_market_data():
     }
     return pd.DataFrame(data)
 
+@st.cache_data(ttl=60)
+def load_market_data(as_of=None):
+    """
+    Market data from the rates store filled by collector.py: the latest snapshot,
+    or the one in force at the end of the day as_of. Instruments the snapshot
+    lacks (a source that failed) keep their static value. Returns the table,
+    the time of its most recent observation (None when nothing was collected)
+    and the instruments taken from the static data.
+    """
+    static = get_initial_market_data()
+    snapshot = RATE_STORE.snapshot(as_of)
+    if snapshot.empty:
+        return static, None, list(static['Instrument'])
+    collected = fx_market_data(snapshot).set_index('Instrument')
+    fallback = [name for name in static['Instrument'] if name not in collected.index]
+    order = list(static['Instrument']) + [name for name in collected.index if name not in set(static['Instrument'])]
+    market_data = collected.combine_first(static.set_index('Instrument')).reindex(order).reset_index()
+    return market_data[static.columns], snapshot['as_of'].max(), fallback
+
 @st.cache_data
 def maturity_to_years(maturity_str):
     """Converts maturity string (e.g., '1M', '1Y') to years."""
@@ -145,10 +166,10 @@ st.markdown("""
 st.markdown('<div class="main-header">FX Forward Pricing</div>', unsafe_allow_html=True)
 st.markdown("---")
 st.info("""
-Please note: The market data used in this application is static and was last updated on **August 1, 2025**.  
+Please note: When the collector (`python collector.py`) runs next to the app, the market data is the latest snapshot it stored, and any past date can be chosen in the Market Data tab. Otherwise the data is static and was last updated on **August 1, 2025**.  
 It is for illustrative purposes only and does not reflect real-time market conditions.
 
-The project includes a functional web scraping module to collect live data. However, deploying it on the Streamlit platform presented significant technical challenges. Therefore, this online version uses a static dataset to ensure stability. For those interested in the process, the source code for scraping the four data sources is available in the project's GitHub repository.
+The project includes a functional web scraping module to collect live data. However, deploying it on the Streamlit platform presented significant technical challenges. Therefore, the online version uses a static dataset to ensure stability. For those interested in the process, the source code for scraping the four data sources is available in the project's GitHub repository.
 
 **Sources:**
 - [Euribor Rates](https://www.euribor-rates.eu/fr/taux-euribor-actuels/)
@@ -231,9 +252,30 @@ with tab1:
 with tab2:
     st.header("Market Data")
     
-    # Load initial data or retrieve from session state
-    if 'market_data' not in st.session_state:
-        st.session_state['market_data'] = get_initial_market_data()
+    # Snapshot of the rates store (latest or end of a past day), static data when empty
+    collection_dates = RATE_STORE.dates()
+    snapshot_date = st.selectbox(
+        "Market data snapshot",
+        [None] + collection_dates,
+        format_func=lambda day: "Latest" if day is None else day.strftime("%Y-%m-%d"),
+        disabled=not collection_dates,
+        key="market_data_snapshot"
+    )
+    snapshot_data, collected_at, fallback = load_market_data(snapshot_date)
+    if collected_at is not None:
+        st.caption(f"Collected data, most recent observation: {collected_at:%Y-%m-%d %H:%M}")
+        if fallback:
+            st.caption(f"Not collected, static values as of August 1, 2025: {', '.join(fallback)}")
+    else:
+        st.caption("No collected data: static market data as of August 1, 2025")
+
+    # Load the snapshot, or retrieve the edited data from session state. The
+    # snapshot is identified by its most recent observation too, so that
+    # "Latest" is reloaded once the collector has stored a newer one
+    snapshot_key = f"{snapshot_date}_{collected_at}"
+    if st.session_state.get('market_data_source') != snapshot_key or 'market_data' not in st.session_state:
+        st.session_state['market_data'] = snapshot_data
+        st.session_state['market_data_source'] = snapshot_key
 
     # Important disclaimer about bonds
     st.warning("""
@@ -255,7 +297,7 @@ with tab2:
         },
         num_rows="dynamic",
         hide_index=True,
-        key="editable_market_data_table"
+        key=f"editable_market_data_table_{snapshot_key}"
     )
     
     # Update session state with the edited data
@@ -508,7 +550,10 @@ with tab4:
     
     # Retrieve dynamic market data
     current_market_data = st.session_state.get('market_data', get_initial_market_data())
-    spot_from_market_data = current_market_data[current_market_data['Instrument'] == 'Spot EUR/USD']['Rate/Price'].iloc[0]
+    spot_rows = current_market_data[current_market_data['Instrument'] == 'Spot EUR/USD']['Rate/Price']
+    if spot_rows.empty:  # Row deleted in the editable table
+        spot_rows = get_initial_market_data().set_index('Instrument').loc[['Spot EUR/USD'], 'Rate/Price']
+    spot_from_market_data = spot_rows.iloc[0]
     
     col1, col2 = st.columns([1, 1])
     
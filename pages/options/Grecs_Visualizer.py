@@ -2,11 +2,16 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import scipy.stats as si
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 
+from pricing.black_scholes import bs_price_and_greeks
+from pricing.fourier import HestonParams, heston_price
+from pricing.implied_vol import implied_volatility
+from pricing.memo import PRICING_CACHE, memoize
+from pricing.surfaces import SURFACE_AXES, greek_surface
+
 
 # CSS to improve the app appearance
 st.markdown("""
@@ -53,74 +58,6 @@ when options are <span class="moneyness itm">In-The-Money (ITM)</span>,
 <span class="moneyness otm">Out-of-The-Money (OTM)</span>.
 """, unsafe_allow_html=True)
 
-# Black-Scholes Option Pricing Model and Greeks calculations
-def d1(S, K, T, r, sigma):
-    return (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-
-def d2(S, K, T, r, sigma):
-    return d1(S, K, T, r, sigma) - sigma * np.sqrt(T)
-
-def bs_call_price(S, K, T, r, sigma):
-    if T <= 0:
-        return max(0, S - K)
-    N_d1 = si.norm.cdf(d1(S, K, T, r, sigma))
-    N_d2 = si.norm.cdf(d2(S, K, T, r, sigma))
-    return S * N_d1 - K * np.exp(-r * T) * N_d2
-
-def bs_put_price(S, K, T, r, sigma):
-    if T <= 0:
-        return max(0, K - S)
-    N_neg_d1 = si.norm.cdf(-d1(S, K, T, r, sigma))
-    N_neg_d2 = si.norm.cdf(-d2(S, K, T, r, sigma))
-    return K * np.exp(-r * T) * N_neg_d2 - S * N_neg_d1
-
-# Greeks calculations
-def delta_call(S, K, T, r, sigma):
-    if T <= 0:
-        return 1.0 if S > K else 0.0
-    return si.norm.cdf(d1(S, K, T, r, sigma))
-
-def delta_put(S, K, T, r, sigma):
-    if T <= 0:
-        return -1.0 if S < K else 0.0
-    return -si.norm.cdf(-d1(S, K, T, r, sigma))
-
-def gamma(S, K, T, r, sigma):
-    if T <= 0:
-        return 0.0
-    return si.norm.pdf(d1(S, K, T, r, sigma)) / (S * sigma * np.sqrt(T))
-
-def theta_call(S, K, T, r, sigma):
-    if T <= 0:
-        return 0.0
-    N_d1 = si.norm.cdf(d1(S, K, T, r, sigma))
-    N_d2 = si.norm.cdf(d2(S, K, T, r, sigma))
-    pdf_d1 = si.norm.pdf(d1(S, K, T, r, sigma))
-    return -S * pdf_d1 * sigma / (2 * np.sqrt(T)) - r * K * np.exp(-r * T) * N_d2
-
-def theta_put(S, K, T, r, sigma):
-    if T <= 0:
-        return 0.0
-    N_neg_d1 = si.norm.cdf(-d1(S, K, T, r, sigma))
-    N_neg_d2 = si.norm.cdf(-d2(S, K, T, r, sigma))
-    pdf_d1 = si.norm.pdf(d1(S, K, T, r, sigma))
-    return -S * pdf_d1 * sigma / (2 * np.sqrt(T)) + r * K * np.exp(-r * T) * N_neg_d2
-
-def vega(S, K, T, r, sigma):
-    if T <= 0:
-        return 0.0
-    return S * np.sqrt(T) * si.norm.pdf(d1(S, K, T, r, sigma)) / 100  # Divided by 100 to get the effect of a 1% change
-
-def rho_call(S, K, T, r, sigma):
-    if T <= 0:
-        return 0.0
-    return K * T * np.exp(-r * T) * si.norm.cdf(d2(S, K, T, r, sigma)) / 100  # Divided by 100 for a 1% change
-
-def rho_put(S, K, T, r, sigma):
-    if T <= 0:
-        return 0.0
-    return -K * T * np.exp(-r * T) * si.norm.cdf(-d2(S, K, T, r, sigma)) / 100
-
 # Sidebar for user inputs
 st.sidebar.markdown('<div class="sub-header">Option Parameters</div>', unsafe_allow_html=True)
 
@@ -155,42 +92,40 @@ price_min = S0 * price_range[0] / 100
 price_max = S0 * price_range[1] / 100
 prices = np.linspace(price_min, price_max, 100)
 
-# Calculate option prices and Greeks across the price range
-if option_type == "Call":
-    option_prices = [bs_call_price(p, K, T, r, sigma) for p in prices]
-    deltas = [delta_call(p, K, T, r, sigma) for p in prices]
-    thetas = [theta_call(p, K, T, r, sigma) for p in prices]
-    rhos = [rho_call(p, K, T, r, sigma) for p in prices]
-else:  # Put
-    option_prices = [bs_put_price(p, K, T, r, sigma) for p in prices]
-    deltas = [delta_put(p, K, T, r, sigma) for p in prices]
-    thetas = [theta_put(p, K, T, r, sigma) for p in prices]
-    rhos = [rho_put(p, K, T, r, sigma) for p in prices]
-
-gammas = [gamma(p, K, T, r, sigma) for p in prices]
-vegas = [vega(p, K, T, r, sigma) for p in prices]
-
-# Convert NumPy arrays to lists for easier indexing
-prices = list(prices)
-option_prices = list(option_prices)
-deltas = list(deltas)
-gammas = list(gammas)
-thetas = list(thetas)
-vegas = list(vegas)
-rhos = list(rhos)
-
-# Determine moneyness regions
-itm_indices = [i for i, p in enumerate(prices) if (p > K if option_type == "Call" else p < K)]
-atm_indices = [i for i, p in enumerate(prices) if np.isclose(p, K, rtol=0.02)]  # 2% tolerance around strike
-otm_indices = [i for i, p in enumerate(prices) if (p < K if option_type == "Call" else p > K)]
+# Curves and current values are memoized process-wide on their scalar inputs, so reruns that do not
+# change them (tab switches, chart widgets) and other sessions viewing the same contract reuse them
+@memoize
+def price_and_greeks(S, K, T, r, sigma, option_type):
+    return bs_price_and_greeks(S, K, T, r, sigma, option_type, higher_order=True)
+
+@memoize
+def price_and_greeks_curves(price_min, price_max, K, T, r, sigma, option_type):
+    prices = np.linspace(price_min, price_max, 100)
+    curves = price_and_greeks.__wrapped__(prices, K, T, r, sigma, option_type)
+    # Shared by every session through the cache: read-only so no caller can alter another's curves
+    for curve in vars(curves).values():
+        if isinstance(curve, np.ndarray):
+            curve.flags.writeable = False
+    return curves
+
+# Calculate option prices and Greeks across the whole price range in one vectorized pass
+curves = price_and_greeks_curves(price_min, price_max, K, T, r, sigma, option_type.lower())
+option_prices, deltas, gammas = curves.price, curves.delta, curves.gamma
+thetas, vegas, rhos = curves.theta, curves.vega, curves.rho
+
+# Determine moneyness regions as boolean masks over the price grid
+itm_mask = prices > K if option_type == "Call" else prices < K
+atm_mask = np.isclose(prices, K, rtol=0.02)  # 2% tolerance around strike
+otm_mask = prices < K if option_type == "Call" else prices > K
 
 # Current option price and Greeks
-current_price = bs_call_price(S0, K, T, r, sigma) if option_type == "Call" else bs_put_price(S0, K, T, r, sigma)
-current_delta = delta_call(S0, K, T, r, sigma) if option_type == "Call" else delta_put(S0, K, T, r, sigma)
-current_gamma = gamma(S0, K, T, r, sigma)
-current_theta = theta_call(S0, K, T, r, sigma) if option_type == "Call" else theta_put(S0, K, T, r, sigma)
-current_vega = vega(S0, K, T, r, sigma)
-current_rho = rho_call(S0, K, T, r, sigma) if option_type == "Call" else rho_put(S0, K, T, r, sigma)
+current = price_and_greeks(S0, K, T, r, sigma, option_type.lower())
+current_price, current_delta, current_gamma = current.price, current.delta, current.gamma
+current_theta, current_vega, current_rho = current.theta, current.vega, current.rho
+
+cache_stats = PRICING_CACHE.stats()
+st.sidebar.caption(f"Pricing cache: {cache_stats.hits:,} hits, {cache_stats.misses:,} misses "
+                   f"({cache_stats.size:,}/{cache_stats.maxsize:,} entries)")
 
 # Current moneyness
 if (option_type == "Call" and S0 > K) or (option_type == "Put" and S0 < K):
@@ -230,43 +165,37 @@ with col2:
     """, unsafe_allow_html=True)
 
 # Create tabs for different visualizations
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["Option Price", "Delta", "Gamma", "Theta", "Vega & Rho"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["Option Price", "Delta", "Gamma", "Theta", "Vega & Rho", "Higher-Order", "Surfaces", "Stochastic Vol"])
+
+# Greek surfaces are cached so that reruns and tab switches reuse the last computed grids
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_surface(greek, axis, spot_min, spot_max, axis_min, axis_max, resolution, K, T, r, sigma, option_type):
+    spots = np.linspace(spot_min, spot_max, resolution)
+    axis_values = np.linspace(axis_min, axis_max, resolution)
+    return spots, axis_values, np.ascontiguousarray(greek_surface(greek, spots, axis, axis_values, K, T, r, sigma, option_type))
+
+# Heston smiles are priced on the whole strike grid at once, then inverted to implied vols
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_heston_smile(S, strike_min, strike_max, T, r, v0, kappa, theta, xi, rho, option_type):
+    strikes = np.linspace(strike_min, strike_max, 200)
+    heston = heston_price(S, strikes, T, r, HestonParams(v0, kappa, theta, xi, rho), option_type)
+    smile = implied_volatility(heston, S, strikes, T, r, option_type).sigma
+    return strikes, heston, smile
 
 # Function to create a plot with moneyness regions
 def create_plot_with_moneyness(x, y, title, y_label, current_x, current_y):
     fig = go.Figure()
     
-    # Extract ITM, ATM, and OTM points
-    itm_x = [x[i] for i in itm_indices]
-    itm_y = [y[i] for i in itm_indices]
-    
-    atm_x = [x[i] for i in atm_indices]
-    atm_y = [y[i] for i in atm_indices]
-    
-    otm_x = [x[i] for i in otm_indices]
-    otm_y = [y[i] for i in otm_indices]
+    x, y = np.asarray(x), np.asarray(y)
     
     # Add moneyness regions
-    if itm_x:
-        fig.add_trace(go.Scatter(
-            x=itm_x, y=itm_y,
-            mode='lines', name='ITM',
-            line=dict(color='#4CAF50', width=3)
-        ))
-    
-    if atm_x:
-        fig.add_trace(go.Scatter(
-            x=atm_x, y=atm_y,
-            mode='lines', name='ATM',
-            line=dict(color='#FFC107', width=3)
-        ))
-    
-    if otm_x:
-        fig.add_trace(go.Scatter(
-            x=otm_x, y=otm_y,
-            mode='lines', name='OTM',
-            line=dict(color='#F44336', width=3)
-        ))
+    for mask, name, color in [(itm_mask, 'ITM', '#4CAF50'), (atm_mask, 'ATM', '#FFC107'), (otm_mask, 'OTM', '#F44336')]:
+        if mask.any():
+            fig.add_trace(go.Scatter(
+                x=x[mask], y=y[mask],
+                mode='lines', name=name,
+                line=dict(color=color, width=3)
+            ))
     
     # Add current point
     fig.add_trace(go.Scatter(
@@ -340,7 +269,7 @@ with tab4:
     """, unsafe_allow_html=True)
     
     # Convert theta to daily values
-    daily_thetas = [t/365 for t in thetas]
+    daily_thetas = thetas / 365
     daily_current_theta = current_theta/365
     
     fig = create_plot_with_moneyness(prices, daily_thetas, f"{option_type} Theta (Daily)", "Theta ($ per day)", S0, daily_current_theta)
@@ -374,6 +303,125 @@ with tab5:
         fig = create_plot_with_moneyness(prices, rhos, f"{option_type} Rho", "Rho ($ per 1% change in interest rate)", S0, current_rho)
         st.plotly_chart(fig, use_container_width=True)
 
+# Tab 6: Higher-order Greeks
+with tab6:
+    st.markdown('<div class="sub-header">Higher-Order Greeks vs. Stock Price</div>', unsafe_allow_html=True)
+    st.markdown("""
+    Second- and third-order Greeks describe how the first-order hedges themselves move.
+    - **Vanna**: Change of Delta when volatility moves (equivalently, change of Vega with the stock price)
+    - **Volga**: Change of Vega when volatility moves, the convexity of the option in volatility
+    - **Charm**: Drift of Delta as time passes, what a delta hedge loses overnight
+    - **Speed**: Change of Gamma with the stock price
+    - **Color**: Drift of Gamma as time passes
+    - **Zomma**: Change of Gamma when volatility moves
+    """)
+    
+    higher_order_greeks = {
+        "Vanna": ("vanna", "Vanna (Delta change per 1% volatility)"),
+        "Volga": ("volga", "Volga (Vega change per 1% volatility)"),
+        "Charm": ("charm", "Charm (Delta change per day)"),
+        "Speed": ("speed", "Speed (Gamma change per $1)"),
+        "Color": ("color", "Color (Gamma change per day)"),
+        "Zomma": ("zomma", "Zomma (Gamma change per 1% volatility)"),
+    }
+    
+    col1, col2 = st.columns(2)
+    for index, (label, (name, y_label)) in enumerate(higher_order_greeks.items()):
+        # Charm and color are per year in the kernel, shown per day like theta
+        scale = 1 / 365 if name in ("charm", "color") else 1.0
+        with (col1 if index % 2 == 0 else col2):
+            fig = create_plot_with_moneyness(prices, getattr(curves, name) * scale, label, y_label,
+                                             S0, getattr(current, name) * scale)
+            st.plotly_chart(fig, use_container_width=True)
+
+# Tab 7: Greek surfaces
+with tab7:
+    st.markdown('<div class="sub-header">Greek Surfaces</div>', unsafe_allow_html=True)
+    st.markdown("""
+    Surfaces show how a Greek evolves when two parameters move at the same time.
+    - **Gamma (Spot × Time)**: Gamma concentrates around the strike as expiration approaches
+    - **Vega (Spot × Volatility)**: Vega is highest around the strike and grows with volatility for OTM options
+    - **Charm (Spot × Time)**: Charm is the drift of Delta as time passes, strongest near the strike close to expiration
+    """)
+    
+    surfaces = {
+        "Gamma (Spot × Time)": ("gamma", "time", "Gamma"),
+        "Vega (Spot × Volatility)": ("vega", "vol", "Vega ($ per 1% change in volatility)"),
+        "Charm (Spot × Time)": ("charm", "time", "Charm (Delta change per year)"),
+    }
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        surface_choice = st.selectbox("Surface", list(surfaces.keys()))
+    with col2:
+        surface_view = st.radio("View", ["Heatmap", "3D Surface"], horizontal=True)
+    with col3:
+        resolution = st.slider("Grid Resolution", min_value=50, max_value=500, value=200, step=50)
+    
+    greek_name, axis, z_label = surfaces[surface_choice]
+    if axis == "time":
+        axis_min, axis_max = 1 / 365.25, max(2 * T, 0.25)
+    else:
+        axis_min, axis_max = 0.05, 1.0
+    
+    spots, axis_values, z = compute_surface(
+        greek_name, axis, price_min, price_max, axis_min, axis_max, resolution, K, T, r, sigma, option_type.lower()
+    )
+    
+    if surface_view == "Heatmap":
+        fig = go.Figure(go.Heatmap(x=spots, y=axis_values, z=z, colorscale="Viridis", colorbar=dict(title=z_label)))
+        fig.add_vline(x=K, line_dash="dash", line_color="white", annotation_text="Strike Price")
+        fig.update_layout(xaxis_title="Stock Price ($)", yaxis_title=SURFACE_AXES[axis])
+    else:
+        fig = go.Figure(go.Surface(x=spots, y=axis_values, z=z, colorscale="Viridis", colorbar=dict(title=z_label)))
+        fig.update_layout(scene=dict(xaxis_title="Stock Price ($)", yaxis_title=SURFACE_AXES[axis], zaxis_title=z_label))
+    fig.update_layout(title=surface_choice, height=600)
+    st.plotly_chart(fig, use_container_width=True)
+
+# Tab 8: Heston stochastic volatility against flat-volatility Black-Scholes
+with tab8:
+    st.markdown('<div class="sub-header">Stochastic Volatility (Heston)</div>', unsafe_allow_html=True)
+    st.markdown("""
+    Under Heston the variance itself is random and mean-reverting. The initial variance is the square of the
+    sidebar volatility, so the difference with Black-Scholes comes only from the dynamics of the variance.
+    - **Correlation (ρ)**: Negative values skew the smile, making OTM puts more expensive
+    - **Vol of Vol (ξ)**: Fattens both tails and curves the smile
+    - **Mean Reversion (κ)** and **Long-run Volatility**: Set how fast and where the variance drifts over the option's life
+    """)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        heston_kappa = st.slider("Mean Reversion (κ)", min_value=0.1, max_value=10.0, value=2.0, step=0.1)
+    with col2:
+        heston_long_vol = st.slider("Long-run Volatility (%)", min_value=5.0, max_value=80.0, value=float(np.clip(sigma * 100, 5.0, 80.0)), step=1.0) / 100
+    with col3:
+        heston_xi = st.slider("Vol of Vol (ξ)", min_value=0.05, max_value=2.0, value=0.5, step=0.05)
+    with col4:
+        heston_rho = st.slider("Correlation (ρ)", min_value=-0.95, max_value=0.95, value=-0.6, step=0.05)
+    
+    heston_T = max(T, 1 / 365.25)
+    strikes, heston_prices, heston_smile = compute_heston_smile(
+        S0, price_min, price_max, heston_T, r, sigma ** 2, heston_kappa, heston_long_vol ** 2, heston_xi, heston_rho, option_type.lower()
+    )
+    bs_prices = bs_price_and_greeks(S0, strikes, heston_T, r, sigma, option_type.lower()).price
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=strikes, y=heston_prices, mode='lines', name='Heston', line=dict(color='#1E88E5', width=3)))
+        fig.add_trace(go.Scatter(x=strikes, y=bs_prices, mode='lines', name='Black-Scholes', line=dict(color='gray', width=2, dash='dash')))
+        fig.add_vline(x=S0, line_dash="dot", line_color="black", annotation_text="Spot")
+        fig.update_layout(title=f"{option_type} Price by Strike", xaxis_title="Strike Price ($)", yaxis_title="Option Price ($)",
+                          height=500, hovermode="x unified")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=strikes, y=heston_smile * 100, mode='lines', name='Heston Implied Vol', line=dict(color='#1E88E5', width=3)))
+        fig.add_hline(y=sigma * 100, line_dash="dash", line_color="gray", annotation_text="Black-Scholes")
+        fig.add_vline(x=S0, line_dash="dot", line_color="black", annotation_text="Spot")
+        fig.update_layout(title="Implied Volatility Smile", xaxis_title="Strike Price ($)", yaxis_title="Implied Volatility (%)",
+                          height=500, hovermode="x unified")
+        st.plotly_chart(fig, use_container_width=True)
+
 # Educational section
 st.markdown('<div class="main-header">Understanding Option Greeks</div>', unsafe_allow_html=True)
 
@@ -1,11 +1,26 @@
 import streamlit as st
-import yfinance as yf
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 import datetime
 import plotly.graph_objects as go
 
+from pricing.black_scholes import calculate_greeks
+from pricing.chain import fetch_listed_chain, price_listed_chain, price_option_chain
+from pricing.implied_vol import implied_volatility
+from pricing.lattice import lattice_price
+from pricing.market_data import LOOKBACKS, MARKET_DATA
+from pricing.memo import PRICING_CACHE, memoize
+from pricing.pde import pde_price
+from pricing.volatility import (
+    UNIVERSE_VOLATILITY, VOL_ESTIMATOR_LABELS, VOL_ESTIMATORS, VOL_WINDOWS, universe_volatility
+)
+
+# Pricing calls are memoized process-wide on quantized inputs: reruns that do not change the
+# contract, and other sessions looking at the same contract, reuse the stored results
+cached_greeks = memoize(calculate_greeks)
+cached_lattice_price = memoize(lattice_price)
+cached_pde_price = memoize(pde_price)
+
 # Initialisation de session_state pour conserver les valeurs entre les exécutions
 if 'strike_price' not in st.session_state:
     st.session_state.strike_price = None
@@ -40,83 +55,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Black-Scholes calculation functions
-def black_scholes_call(S, K, T, r, sigma):
-    if T <= 0:
-        return max(0, S - K)
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    call_price = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-    return call_price
-
-def black_scholes_put(S, K, T, r, sigma):
-    if T <= 0:
-        return max(0, K - S)
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    put_price = K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-    return put_price
+# Historical volatility of one ticker for the selected lookback and estimator only, refreshed every 15 minutes
+@st.cache_data(ttl=900, show_spinner=False)
+def load_volatility_table(ticker, lookback, estimator):
+    return universe_volatility([ticker], windows=(VOL_WINDOWS[lookback],), estimators=[estimator], lookback=lookback)
 
-# Greeks calculation
-def calculate_greeks(S, K, T, r, sigma, option_type="call"):
-    if T <= 0:
-        return {"delta": 1 if S > K else 0, "gamma": 0, "theta": 0, "vega": 0, "rho": 0}
-    
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    
-    # Delta
-    if option_type == "call":
-        delta = norm.cdf(d1)
-    else:
-        delta = norm.cdf(d1) - 1
-    
-    # Gamma (same for call and put)
-    gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-    
-    # Theta
-    if option_type == "call":
-        theta = -S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) - r * K * np.exp(-r * T) * norm.cdf(d2)
-    else:
-        theta = -S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) + r * K * np.exp(-r * T) * norm.cdf(-d2)
-    
-    # Vega (same for call and put)
-    vega = S * np.sqrt(T) * norm.pdf(d1)
-    
-    # Rho
-    if option_type == "call":
-        rho = K * T * np.exp(-r * T) * norm.cdf(d2)
-    else:
-        rho = -K * T * np.exp(-r * T) * norm.cdf(-d2)
-    
-    return {
-        "delta": delta,
-        "gamma": gamma,
-        "theta": theta / 365,  # Daily theta
-        "vega": vega / 100,    # For 1% volatility change
-        "rho": rho / 100       # For 1% interest rate change
-    }
-
-# Historical volatility calculation
-def calculate_volatility(ticker):
+# Historical volatility calculation: read from the universe table once the background batch has
+# computed it, otherwise from the requested ticker alone, so the first render never waits for the universe
+def calculate_volatility(ticker, lookback="60d", estimator="close_to_close"):
     try:
-        # Download last 60 days of trading data
-        data = yf.download(ticker, period="60d", interval="1d")
-        if data.empty:
-            return 0.3  # Default value if no data available
+        table = UNIVERSE_VOLATILITY.table()
+        if table is None or ticker not in set(table["ticker"]):
+            table = load_volatility_table(ticker, lookback, estimator)
         
-        # Calculate daily returns
-        data['Returns'] = data['Close'].pct_change().fillna(0)
-        
-        # Standard deviation of returns * sqrt(252) (trading days per year)
-        # to annualize volatility
-        volatility = data['Returns'].std() * np.sqrt(252)
-        return volatility
+        # Annualized (×√252) volatility over the window matching the lookback
+        row = table[(table["ticker"] == ticker) & (table["estimator"] == estimator) & (table["window"] == VOL_WINDOWS[lookback])]
+        if row.empty or not np.isfinite(row["volatility"].iloc[0]):
+            return 0.3  # Default value if no data available
+        return float(row["volatility"].iloc[0])
     except:
         return 0.3  # Default value in case of error
 
-# Updated payoff diagram to show buyer and seller with zoom on breakeven point
-def plot_option_payoff(S, K, premium, option_type="call"):
+# Payoff curves of the diagram, memoized (read-only arrays, shared between sessions)
+@memoize
+def payoff_curves(S, K, premium, option_type="call"):
     # Calculate breakeven point
     if option_type == "call":
         breakeven = K + premium
@@ -153,6 +115,16 @@ def plot_option_payoff(S, K, premium, option_type="call"):
         seller_payoffs = premium - np.maximum(K - stock_prices, 0)
         seller_breakeven = buyer_breakeven
     
+    for curve in (stock_prices, buyer_payoffs, seller_payoffs):
+        curve.flags.writeable = False
+    return min_price, max_price, stock_prices, buyer_payoffs, seller_payoffs, buyer_breakeven
+
+# Updated payoff diagram to show buyer and seller with zoom on breakeven point
+# (a new Figure on every call: figures are mutable and must not be shared through the cache)
+def plot_option_payoff(S, K, premium, option_type="call"):
+    min_price, max_price, stock_prices, buyer_payoffs, seller_payoffs, buyer_breakeven = \
+        payoff_curves(S, K, premium, option_type)
+    
     fig = go.Figure()
     
     # Payoff curve for buyer
@@ -256,6 +228,11 @@ def plot_option_payoff(S, K, premium, option_type="call"):
     
     return fig
 
+# Listed option chain, refreshed every 15 minutes
+@st.cache_data(ttl=900, show_spinner=False)
+def load_listed_chain(ticker):
+    return fetch_listed_chain(ticker)
+
 # Fonction pour définir le prix d'exercice au prix actuel
 def set_strike_to_current():
     st.session_state.set_to_current = True
@@ -283,14 +260,18 @@ A complete Black-Scholes calculator for option pricing, payoff visualization, an
         # Option type (moved to top)
         option_type = st.radio("Option Type", ["Call", "Put"])
         
+        # Exercise style: American options are priced on a binomial lattice
+        exercise_style = st.radio("Exercise Style", ["European", "American"], horizontal=True)
+        if exercise_style == "American":
+            american_engine = st.selectbox("American Pricing Engine", ["Binomial Tree", "Crank-Nicolson PDE"])
+        
         # Stock ticker
         ticker = st.text_input('Stock Symbol', 'AAPL').upper()
         
         try:
-            # Data retrieval
-            stock = yf.Ticker(ticker)
-            stock_info = stock.history(period="1d")
-            current_price = stock_info['Close'][0]
+            # Data retrieval: the last bar of the locally stored history, whose missing bars are fetched in the background
+            stock_info = MARKET_DATA.history(ticker, period="5d")
+            current_price = stock_info['Close'].iloc[-1]
             
             # CHANGEMENT 1: Suppression de l'affichage du prix actuel ici
             # Il sera affiché dans la colonne des résultats avec les autres métriques
@@ -339,12 +320,15 @@ A complete Black-Scholes calculator for option pricing, payoff visualization, an
                 pass  # La logique est gérée dans la fonction on_click
             
             # Volatility
-            volatility = calculate_volatility(ticker)
+            lookback = st.selectbox("Volatility Lookback", LOOKBACKS, format_func=lambda period: period.replace("d", " days").replace("y", " year(s)"))
+            estimator = st.selectbox("Volatility Estimator", VOL_ESTIMATORS, format_func=VOL_ESTIMATOR_LABELS.get)
+            volatility = calculate_volatility(ticker, lookback, estimator)
             sigma = st.slider("Volatility (σ) %", min_value=1.0, max_value=100.0, value=float(volatility * 100), step=0.1) / 100
             
             st.info(f"""
-            **Volatility Calculation**: Historical volatility is calculated over the last 60 trading days.
-            It represents the annualized standard deviation of daily stock returns (×√252).
+            **Volatility Calculation**: Historical volatility is calculated over the last {VOL_WINDOWS[lookback]} trading days with the {VOL_ESTIMATOR_LABELS[estimator]} estimator.
+            Close-to-Close is the annualized standard deviation of daily log returns (×√252); EWMA weights recent returns more;
+            Parkinson, Garman-Klass and Yang-Zhang also use the daily open, high and low, which makes them more precise over few days.
             Calculated value for {ticker}: **{volatility*100:.2f}%**
             """)
             
@@ -365,13 +349,19 @@ For accurate valuation, check current bond yield data.
     # Results column
     with col_results:
         try:
-            # Option price calculation
-            if option_type == "Call":
-                option_price = black_scholes_call(current_price, K, T, r, sigma)
-                greeks = calculate_greeks(current_price, K, T, r, sigma, "call")
-            else:
-                option_price = black_scholes_put(current_price, K, T, r, sigma)
-                greeks = calculate_greeks(current_price, K, T, r, sigma, "put")
+            # Option price and Greeks calculation (single pass)
+            greeks = cached_greeks(current_price, K, T, r, sigma, option_type.lower(), higher_order=True)
+            if exercise_style == "American":
+                # Price, delta, gamma and theta read off a 1000-step CRR tree or a 500x500 finite-difference grid
+                if american_engine == "Binomial Tree":
+                    american = cached_lattice_price(current_price, K, T, r, sigma, option_type.lower(), american=True, steps=1000)
+                else:
+                    american = cached_pde_price(current_price, K, T, r, sigma, option_type.lower(), american=True)
+                # A new dict: the cached one is shared with other sessions. The engines return 0-d arrays,
+                # converted to floats so that the memoized calls below (payoff curves) can key on them
+                greeks = {**greeks, "price": float(american.price), "delta": float(american.delta),
+                          "gamma": float(american.gamma), "theta": float(american.theta) / 365}
+            option_price = greeks["price"]
             
             # CHANGEMENT 1: Affichage des métriques clés - maintenant avec 4 colonnes incluant le prix actuel
             col1, col2, col3, col4 = st.columns(4)
@@ -385,7 +375,7 @@ For accurate valuation, check current bond yield data.
                 st.markdown(f"<div class='card'><p class='metric-label'>Days to Expiry</p><p class='metric-value'>{days_to_expiry}</p></div>", unsafe_allow_html=True)
             
             # Tabs for different visualizations
-            tab1, tab2, = st.tabs(["Payoff", "Greeks"])
+            tab1, tab2, tab3 = st.tabs(["Payoff", "Greeks", "Option Chain"])
             
             with tab1:
                 # More prominent title for payoff
@@ -439,6 +429,26 @@ For accurate valuation, check current bond yield data.
                 with c5:
                     st.markdown(f"<div class='card'><p class='metric-label'>Rho</p><p class='metric-value'>{greeks['rho']:.4f}</p></div>", unsafe_allow_html=True)
                 
+                # Second- and third-order Greeks, from the same closed-form pass
+                st.markdown("#### Higher-Order Greeks")
+                higher_order_labels = [("Vanna", "vanna"), ("Volga", "volga"), ("Charm", "charm"),
+                                       ("Speed", "speed"), ("Color", "color"), ("Zomma", "zomma")]
+                for column, (label, name) in zip(st.columns(6), higher_order_labels):
+                    with column:
+                        st.markdown(f"<div class='card'><p class='metric-label'>{label}</p><p class='metric-value'>{greeks[name]:.5f}</p></div>", unsafe_allow_html=True)
+                
+                if exercise_style == "American":
+                    st.caption(f"Delta, Gamma and Theta come from the {american_engine.lower()}; Vega, Rho and the higher-order Greeks are the European (Black-Scholes) values.")
+                
+                cache_stats = PRICING_CACHE.stats()
+                st.caption(f"Pricing cache: {cache_stats.hits:,} hits, {cache_stats.misses:,} misses, "
+                           f"{cache_stats.size:,}/{cache_stats.maxsize:,} entries shared across sessions")
+                data_stats = MARKET_DATA.stats()
+                st.caption(f"Market data cache{' (offline)' if data_stats.offline else ''}: "
+                           f"{data_stats.memory_hits:,} memory hits, {data_stats.disk_hits:,} disk hits, "
+                           f"{data_stats.misses:,} downloads, {data_stats.stale_served:,} served stale while refreshing, "
+                           f"{data_stats.bars_fetched:,} bars fetched")
+                
                 with st.expander("What Do the Greeks Mean?"):
                     st.markdown("""
                     - **Delta**: Measures the rate of change of the option price with respect to changes in the underlying asset's price.
@@ -446,8 +456,36 @@ For accurate valuation, check current bond yield data.
                     - **Theta**: Measures the rate of change of the option price with respect to time (time decay).
                     - **Vega**: Measures the rate of change of the option price with respect to volatility.
                     - **Rho**: Measures the rate of change of the option price with respect to the risk-free interest rate.
+                    - **Vanna / Volga**: Change of delta / vega for a 1% move in volatility.
+                    - **Charm / Color**: Daily drift of delta / gamma as time passes.
+                    - **Speed / Zomma**: Change of gamma for a $1 move in the underlying / a 1% move in volatility.
                     """)
 
+            with tab3:
+                st.markdown("<h3 style='text-align: center;'>Full Option Chain</h3>", unsafe_allow_html=True)
+                
+                # Every listed strike at every listed expiry, priced in one vectorized call
+                try:
+                    listed = load_listed_chain(ticker)
+                except Exception:
+                    listed = None
+                
+                if listed is not None and not listed.empty:
+                    chain = price_listed_chain(listed, current_price, r, sigma)
+                    # Volatility implied by the last traded premium of each contract
+                    implied = implied_volatility(listed["lastPrice"], current_price, chain["strike"],
+                                                 chain["time_to_expiry"], r, chain["type"].astype(str))
+                    chain["market_price"] = listed["lastPrice"].to_numpy()
+                    chain["implied_vol"] = implied.sigma
+                    st.caption(f"{len(chain)} listed contracts priced with σ = {sigma*100:.1f}% and r = {r*100:.1f}%")
+                else:
+                    # No listed chain available: price a strike grid around the spot for the standard expiries
+                    strikes = np.round(np.linspace(current_price * 0.7, current_price * 1.3, 61), 2)
+                    chain = price_option_chain(current_price, strikes, list(expiry_options.values()), r, sigma)
+                    st.caption("No listed chain available for this ticker, showing a strike grid of ±30% around the current price.")
+                
+                st.dataframe(chain, use_container_width=True, hide_index=True)
+
         except Exception as e:
             st.error(f"Calculation error: {e}")
 
@@ -2,29 +2,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from dataclasses import dataclass
-from typing import List, Optional, Literal, Dict, Tuple, Union
+from typing import List
 
+from pricing.monte_carlo import monte_carlo_price
+from pricing.portfolio import BOOK_GREEKS, PositionBook, book_risk
+from pricing.strategies import StrategyOption, Strategy, calculate_option_pl, calculate_profit_loss
 
-# Definition of types
-@dataclass
-class StrategyOption:
-    type: Literal["call", "put", "stock"]
-    strike: float
-    premium: float
-    quantity: int
-    position: Literal["long", "short"]
-
-@dataclass
-class Strategy:
-    id: str
-    name: str
-    description: str
-    legs: List[StrategyOption]
-    interview_notes: str  # Specific notes for interviews
-    max_profit: Optional[float] = None
-    max_loss: Optional[float] = None
-    break_even_points: Optional[List[float]] = None
 
 STRATEGIES = [
     Strategy(
@@ -139,33 +122,6 @@ STRATEGIES = [
 ]
 
 
-# Calculation functions
-def calculate_intrinsic_value(option: StrategyOption, underlying_price: float) -> float:
-    """Calculates the intrinsic value of an option"""
-    if option.type == "stock":
-        return underlying_price - option.strike
-    elif option.type == "call":
-        return max(0, underlying_price - option.strike)
-    else:  # put
-        return max(0, option.strike - underlying_price)
-
-def calculate_option_pl(option: StrategyOption, underlying_price: float) -> float:
-    """Calculates the profit/loss for an individual option at a given price"""
-    if option.type == "stock":
-        pl = (underlying_price - option.premium) * option.quantity
-        return pl if option.position == "long" else -pl
-        
-    intrinsic = calculate_intrinsic_value(option, underlying_price)
-    
-    if option.position == "long":
-        return (intrinsic - option.premium) * option.quantity
-    else:  # position == "short"
-        return (option.premium - intrinsic) * option.quantity
-
-def calculate_profit_loss(strategy: Strategy, underlying_price: float) -> float:
-    """Calculates the total profit/loss for a strategy at a given price"""
-    return sum(calculate_option_pl(leg, underlying_price) for leg in strategy.legs)
-
 def get_directionality(strategy: Strategy) -> str:
     """Determines the strategy's directionality"""
     id = strategy.id
@@ -522,6 +478,38 @@ with col2:
         st.markdown("**Break-even points:** No break-even points identified")
 
 
+# Monte Carlo valuation of the strategy legs before expiration
+st.markdown("### Monte Carlo Valuation")
+with st.expander("Value the strategy today by simulation"):
+    st.markdown("Simulates the underlying under geometric Brownian motion and discounts the payoff of every leg. "
+                "The **Asian** style pays on the average price over the monitoring dates instead of the final price.")
+    mc_col1, mc_col2, mc_col3, mc_col4 = st.columns(4)
+    with mc_col1:
+        mc_sigma = st.slider("Volatility (%)", min_value=5.0, max_value=100.0, value=20.0, step=1.0, key="mc_sigma") / 100
+    with mc_col2:
+        mc_days = st.slider("Days to Expiry", min_value=7, max_value=365, value=90, step=1, key="mc_days")
+    with mc_col3:
+        mc_rate = st.slider("Risk-Free Rate (%)", min_value=0.0, max_value=10.0, value=3.0, step=0.1, key="mc_rate") / 100
+    with mc_col4:
+        mc_style = st.selectbox("Payoff Style", ["european", "asian"], format_func=str.capitalize, key="mc_style")
+    
+    if st.button("Run Simulation"):
+        mc_result = monte_carlo_price(
+            selected_strategy.legs, underlying_price, mc_days / 365.0, mc_rate, mc_sigma,
+            payoff_style=mc_style, n_paths=200_000, n_steps=mc_days if mc_style == "asian" else 1
+        )
+        st.markdown(f"**Strategy value:** {mc_result.price:.4f} ± {1.96 * mc_result.std_error:.4f} (95% confidence)")
+        st.caption(f"{mc_result.n_paths:,} paths in {mc_result.elapsed:.2f}s ({mc_result.paths_per_sec:,.0f} paths/sec)")
+    
+    # Closed-form Greeks of the whole position, leg by leg and in total
+    strategy_risk = book_risk(PositionBook.from_legs(selected_strategy.legs, "Underlying", mc_days),
+                              underlying_price, mc_rate, mc_sigma)
+    leg_greeks = pd.DataFrame(strategy_risk.position, columns=BOOK_GREEKS)
+    leg_greeks.index = [f"{leg.position.capitalize()} {leg.quantity} {leg.type} {leg.strike:g}" for leg in selected_strategy.legs]
+    leg_greeks.loc["Total"] = strategy_risk.total
+    st.markdown("**Position Greeks** (theta per day, vega and rho per 1%)")
+    st.dataframe(leg_greeks.style.format("{:.4f}"), use_container_width=True)
+
 # Footer message
 st.markdown("---")
 st.markdown(
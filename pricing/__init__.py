@@ -0,0 +1 @@
+"""Shared option pricing code used by the Streamlit pages."""
@@ -0,0 +1,225 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from pricing.ad import as_float_array
+from pricing.normal import norm_cdf, norm_pdf
+
+
+# Every function below accepts scalars or NumPy arrays of any (broadcastable)
+# shape for S, K, T, r and sigma. Options with T <= 0 are valued at expiry
+# through masks instead of Python branches, so a whole grid is priced in one call.
+# Units follow the Greeks Visualizer: theta per year, vega and rho per 1% move.
+
+def _as_arrays(S, K, T, r, sigma):
+    # Vars pass through untouched so the closed forms can be differentiated (see pricing.ad)
+    return tuple(as_float_array(x) for x in (S, K, T, r, sigma))
+
+def _live_time(T):
+    """Returns the expiry mask and a time to maturity that is safe to divide by."""
+    expired = T <= 0
+    return expired, np.where(expired, 1.0, T)
+
+def _scalar(x):
+    """Returns a plain scalar for 0-d results so single-option calls keep working."""
+    return x[()] if isinstance(x, np.ndarray) else x
+
+def d1(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    value = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T_live) / (sigma * np.sqrt(T_live))
+    # At expiry d1 collapses to +/- infinity depending on moneyness
+    return _scalar(np.where(expired, np.where(S > K, np.inf, -np.inf), value))
+
+def d2(S, K, T, r, sigma):
+    T = as_float_array(T)
+    return _scalar(d1(S, K, T, r, sigma) - as_float_array(sigma) * np.sqrt(np.maximum(T, 0.0)))
+
+def bs_call_price(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    N_d1 = norm_cdf(d1(S, K, T_live, r, sigma))
+    N_d2 = norm_cdf(d2(S, K, T_live, r, sigma))
+    price = S * N_d1 - K * np.exp(-r * T_live) * N_d2
+    return _scalar(np.where(expired, np.maximum(S - K, 0.0), price))
+
+def bs_put_price(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    N_neg_d1 = norm_cdf(-d1(S, K, T_live, r, sigma))
+    N_neg_d2 = norm_cdf(-d2(S, K, T_live, r, sigma))
+    price = K * np.exp(-r * T_live) * N_neg_d2 - S * N_neg_d1
+    return _scalar(np.where(expired, np.maximum(K - S, 0.0), price))
+
+# Greeks calculations
+def delta_call(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    delta = norm_cdf(d1(S, K, T_live, r, sigma))
+    return _scalar(np.where(expired, np.where(S > K, 1.0, 0.0), delta))
+
+def delta_put(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    delta = -norm_cdf(-d1(S, K, T_live, r, sigma))
+    return _scalar(np.where(expired, np.where(S < K, -1.0, 0.0), delta))
+
+def gamma(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    value = norm_pdf(d1(S, K, T_live, r, sigma)) / (S * sigma * np.sqrt(T_live))
+    return _scalar(np.where(expired, 0.0, value))
+
+def theta_call(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    N_d2 = norm_cdf(d2(S, K, T_live, r, sigma))
+    pdf_d1 = norm_pdf(d1(S, K, T_live, r, sigma))
+    value = -S * pdf_d1 * sigma / (2 * np.sqrt(T_live)) - r * K * np.exp(-r * T_live) * N_d2
+    return _scalar(np.where(expired, 0.0, value))
+
+def theta_put(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    N_neg_d2 = norm_cdf(-d2(S, K, T_live, r, sigma))
+    pdf_d1 = norm_pdf(d1(S, K, T_live, r, sigma))
+    value = -S * pdf_d1 * sigma / (2 * np.sqrt(T_live)) + r * K * np.exp(-r * T_live) * N_neg_d2
+    return _scalar(np.where(expired, 0.0, value))
+
+def vega(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    value = S * np.sqrt(T_live) * norm_pdf(d1(S, K, T_live, r, sigma)) / 100  # Divided by 100 to get the effect of a 1% change
+    return _scalar(np.where(expired, 0.0, value))
+
+def rho_call(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    value = K * T_live * np.exp(-r * T_live) * norm_cdf(d2(S, K, T_live, r, sigma)) / 100  # Divided by 100 for a 1% change
+    return _scalar(np.where(expired, 0.0, value))
+
+def rho_put(S, K, T, r, sigma):
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    expired, T_live = _live_time(T)
+    value = -K * T_live * np.exp(-r * T_live) * norm_cdf(-d2(S, K, T_live, r, sigma)) / 100
+    return _scalar(np.where(expired, 0.0, value))
+
+def charm(S, K, T, r, sigma):
+    """
+    Rate of change of delta as time passes (per year, same for calls and puts
+    without dividends). The charm of bs_price_and_greeks(..., higher_order=True).
+    """
+    return bs_price_and_greeks(S, K, T, r, sigma, "call", higher_order=True).charm
+
+# Second- and third-order Greeks returned by bs_price_and_greeks(..., higher_order=True)
+HIGHER_ORDER_GREEKS = ["vanna", "volga", "charm", "speed", "color", "zomma"]
+
+@dataclass
+class BSGreeks:
+    """
+    Price and Greeks of a batch of options, one array per field.
+
+    Higher-order fields are None unless requested. vanna, volga and zomma
+    follow vega and are per 1% change in volatility; charm and color are per year.
+    """
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    rho: np.ndarray
+    vanna: Optional[np.ndarray] = None  # d delta / d sigma
+    volga: Optional[np.ndarray] = None  # d vega / d sigma
+    charm: Optional[np.ndarray] = None  # d delta / d t
+    speed: Optional[np.ndarray] = None  # d gamma / d S
+    color: Optional[np.ndarray] = None  # d gamma / d t
+    zomma: Optional[np.ndarray] = None  # d gamma / d sigma
+
+def bs_price_and_greeks(S, K, T, r, sigma, option_type="call", higher_order=False):
+    """
+    Price, delta, gamma, theta, vega and rho in a single pass.
+
+    log, sqrt, exp, pdf and cdf are each evaluated once per input and shared by
+    every output. option_type is "call", "put" or an array of them broadcasting
+    against the other inputs. higher_order adds HIGHER_ORDER_GREEKS, built from
+    the same intermediates (no dividends, so they are the same for calls and puts).
+    """
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    is_call = np.asarray(option_type) == "call"
+    expired, T_live = _live_time(T)
+
+    sqrt_T = np.sqrt(T_live)
+    vol_sqrt_T = sigma * sqrt_T
+    d_1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T_live) / vol_sqrt_T
+    d_2 = d_1 - vol_sqrt_T
+    pdf_d1 = norm_pdf(d_1)
+    N_d1 = norm_cdf(d_1)
+    N_d2 = norm_cdf(d_2)
+    K_disc = K * np.exp(-r * T_live)
+
+    # Put values follow from the call ones through N(-x) = 1 - N(x)
+    call_price = S * N_d1 - K_disc * N_d2
+    price = np.where(is_call, call_price, call_price - S + K_disc)
+    delta = np.where(is_call, N_d1, N_d1 - 1.0)
+    gamma_ = pdf_d1 / (S * vol_sqrt_T)
+    time_decay = -S * pdf_d1 * sigma / (2 * sqrt_T)
+    theta = np.where(is_call, time_decay - r * K_disc * N_d2, time_decay + r * K_disc * (1.0 - N_d2))
+    vega_ = S * sqrt_T * pdf_d1 / 100  # Per 1% change in volatility
+    rho = np.where(is_call, K_disc * T_live * N_d2, -K_disc * T_live * (1.0 - N_d2)) / 100  # Per 1% change in rate
+
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    expiry_delta = np.where(is_call, np.where(S > K, 1.0, 0.0), np.where(S < K, -1.0, 0.0))
+    greeks = BSGreeks(
+        price=_scalar(np.where(expired, intrinsic, price)),
+        delta=_scalar(np.where(expired, expiry_delta, delta)),
+        gamma=_scalar(np.where(expired, 0.0, gamma_)),
+        theta=_scalar(np.where(expired, 0.0, theta)),
+        vega=_scalar(np.where(expired, 0.0, vega_)),
+        rho=_scalar(np.where(expired, 0.0, rho)),
+    )
+    if higher_order:
+        # Reciprocals taken once and shared, so every Greek below is a couple of multiplications
+        per_vol_pct = 0.01 / sigma  # Per 1% change in volatility
+        half_per_T = 0.5 / T_live
+        d1_d2 = d_1 * d_2
+        drift = r / vol_sqrt_T - d_2 * half_per_T
+        gamma_per_S = gamma_ / S
+        higher = {
+            "vanna": -(pdf_d1 * d_2) * per_vol_pct,
+            "volga": vega_ * d1_d2 * per_vol_pct,
+            "charm": -(pdf_d1 * drift),
+            "speed": -(gamma_per_S * (d_1 / vol_sqrt_T + 1.0)),
+            "color": gamma_ * (half_per_T + d_1 * drift),
+            "zomma": gamma_ * (d1_d2 - 1.0) * per_vol_pct,
+        }
+        # The expiry mask costs a full pass per Greek, only pay for it when something expired
+        any_expired = np.any(expired)
+        for name, value in higher.items():
+            setattr(greeks, name, _scalar(np.where(expired, 0.0, value) if any_expired else value))
+    return greeks
+
+# Names used by the Pricer page
+black_scholes_call = bs_call_price
+black_scholes_put = bs_put_price
+
+def calculate_greeks(S, K, T, r, sigma, option_type="call", higher_order=False):
+    """
+    Price and Greeks in the Pricer's units: daily theta, vega and rho per 1% move.
+
+    higher_order adds HIGHER_ORDER_GREEKS, with charm and color per day.
+    """
+    greeks = bs_price_and_greeks(S, K, T, r, sigma, option_type, higher_order)
+    result = {
+        "price": greeks.price,
+        "delta": greeks.delta,
+        "gamma": greeks.gamma,
+        "theta": greeks.theta / 365,  # Daily theta
+        "vega": greeks.vega,
+        "rho": greeks.rho
+    }
+    if higher_order:
+        result.update({name: getattr(greeks, name) for name in HIGHER_ORDER_GREEKS})
+        result["charm"] = greeks.charm / 365
+        result["color"] = greeks.color / 365
+    return result
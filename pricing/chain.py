@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from pricing.black_scholes import HIGHER_ORDER_GREEKS, calculate_greeks
+
+
+CHAIN_COLUMNS = ["type", "strike", "days_to_expiry", "time_to_expiry", "price", "delta", "gamma", "theta", "vega", "rho"]
+
+
+def price_contracts(S, strikes, days_to_expiry, r, sigma, option_types, higher_order=False):
+    """
+    Prices a flat list of contracts in one vectorized call.
+
+    strikes, days_to_expiry, option_types (and optionally sigma) are aligned
+    arrays with one entry per contract. Greeks use the Pricer's units.
+    Returns a tidy DataFrame with one row per contract, with one more column
+    per HIGHER_ORDER_GREEKS entry when higher_order is set.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    days = np.asarray(days_to_expiry, dtype=float)
+    option_types = np.asarray(option_types)
+    T = days / 365.0
+
+    greeks = calculate_greeks(S, strikes, T, r, sigma, option_types, higher_order)
+    size = np.broadcast(strikes, T, option_types, np.asarray(sigma)).shape
+    is_put = np.ravel(np.broadcast_to(option_types != "call", size))
+    chain = {"type": pd.Categorical.from_codes(is_put.astype(np.int8), categories=["call", "put"])}
+    chain["strike"] = np.ravel(np.broadcast_to(strikes, size))
+    chain["days_to_expiry"] = np.ravel(np.broadcast_to(days, size))
+    chain["time_to_expiry"] = np.ravel(np.broadcast_to(T, size))
+    columns = CHAIN_COLUMNS + (HIGHER_ORDER_GREEKS if higher_order else [])
+    chain.update({name: np.ravel(np.broadcast_to(greeks[name], size)) for name in columns[4:]})
+    return pd.DataFrame(chain, columns=columns)
+
+def price_option_chain(S, strikes, days_to_expiry, r, sigma, option_types=("call", "put"), higher_order=False):
+    """
+    Prices every strike at every expiry for each option type.
+
+    The (type x expiry x strike) grid is built by broadcasting, never by looping,
+    so a 100k-contract chain costs a single kernel evaluation.
+    """
+    option_types = np.asarray(option_types)[:, None, None]
+    days = np.asarray(days_to_expiry, dtype=float)[None, :, None]
+    strikes = np.asarray(strikes, dtype=float)[None, None, :]
+    return price_contracts(S, strikes, days, r, sigma, option_types, higher_order)
+
+
+def price_listed_chain(listed, S, r, sigma, higher_order=False):
+    """
+    Prices a chain of listed contracts.
+
+    listed is a DataFrame with "type", "strike" and "days_to_expiry" columns,
+    such as the one returned by fetch_listed_chain. An "impliedVolatility"
+    column, when present and sigma is None, is used contract by contract.
+    """
+    if sigma is None:
+        sigma = listed["impliedVolatility"].to_numpy(dtype=float)
+    return price_contracts(S, listed["strike"].to_numpy(), listed["days_to_expiry"].to_numpy(),
+                           r, sigma, listed["type"].to_numpy(), higher_order)
+
+
+def fetch_listed_chain(ticker, max_expiries=None):
+    """Downloads every listed strike at every expiry for a ticker from Yahoo Finance."""
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    today = pd.Timestamp.today().normalize()
+    frames = []
+    for expiry in stock.options[:max_expiries]:
+        days = (pd.Timestamp(expiry) - today).days
+        if days < 0:
+            continue
+        calls_puts = stock.option_chain(expiry)
+        for option_type, table in (("call", calls_puts.calls), ("put", calls_puts.puts)):
+            frames.append(pd.DataFrame({
+                "type": option_type,
+                "strike": table["strike"].to_numpy(dtype=float),
+                "days_to_expiry": days,
+                "impliedVolatility": table["impliedVolatility"].to_numpy(dtype=float),
+                "lastPrice": table["lastPrice"].to_numpy(dtype=float),
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["type", "strike", "days_to_expiry", "impliedVolatility", "lastPrice"])
+    return pd.concat(frames, ignore_index=True)
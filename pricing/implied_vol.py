@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from pricing.black_scholes import bs_price_and_greeks
+
+
+SIGMA_MIN = 1e-4
+SIGMA_MAX = 5.0
+
+
+@dataclass
+class ImpliedVolResult:
+    """Implied volatilities with per-contract solver diagnostics."""
+    sigma: np.ndarray       # nan where no volatility reproduces the price
+    iterations: np.ndarray  # Newton/bisection steps spent on each contract
+    converged: np.ndarray   # False for arbitrage violations, expired contracts or no convergence
+
+
+def _initial_guess(call_price, S, K_disc, T):
+    """Corrado-Miller approximation, falling back to Brenner-Subrahmanyam."""
+    half_gap = call_price - (S - K_disc) / 2
+    root = np.sqrt(np.maximum(half_gap ** 2 - (S - K_disc) ** 2 / np.pi, 0.0))
+    guess = np.sqrt(2 * np.pi / T) / (S + K_disc) * (half_gap + root)
+    fallback = np.sqrt(2 * np.pi / T) * call_price / S
+    guess = np.where(np.isfinite(guess) & (guess > 0), guess, fallback)
+    return np.clip(guess, SIGMA_MIN, SIGMA_MAX)
+
+
+def implied_volatility(price, S, K, T, r, option_type="call", tol=1e-8, max_iter=50):
+    """
+    Backs out the Black-Scholes volatility of every contract at once.
+
+    Each contract keeps a [low, high] bracket on sigma. Newton steps use the
+    vega from the fused kernel; a step that leaves the bracket, or a vanishing
+    vega, is replaced by bisection. Only the unconverged contracts are
+    re-evaluated at each iteration.
+    """
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T, r)))
+    shape = price.shape
+    is_call = np.broadcast_to(np.asarray(option_type) == "call", shape)
+    price, S, K, T, r, is_call = (np.ravel(x) for x in (price, S, K, T, r, is_call))
+
+    sigma = np.full(price.shape, np.nan)
+    iterations = np.zeros(price.shape, dtype=np.int64)
+    converged = np.zeros(price.shape, dtype=bool)
+
+    # Only prices strictly inside the no-arbitrage bounds have an implied volatility
+    live = T > 0
+    K_disc = K * np.exp(-r * np.where(live, T, 0.0))
+    call_price = np.where(is_call, price, price + S - K_disc)
+    valid = live & (call_price > np.maximum(S - K_disc, 0.0)) & (call_price < S)
+
+    idx = np.flatnonzero(valid)
+    target = call_price[idx]
+    low = np.full(idx.shape, SIGMA_MIN)
+    high = np.full(idx.shape, SIGMA_MAX)
+    guess = _initial_guess(target, S[idx], K_disc[idx], T[idx])
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        greeks = bs_price_and_greeks(S[idx], K[idx], T[idx], r[idx], guess, "call")
+        diff = greeks.price - target
+        iterations[idx] += 1
+
+        # Call prices increase with sigma, so the sign of diff tightens the bracket
+        high = np.where(diff > 0, guess, high)
+        low = np.where(diff < 0, guess, low)
+
+        raw_vega = greeks.vega * 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = guess - diff / raw_vega
+        outside = ~np.isfinite(newton) | (newton <= low) | (newton >= high)
+        step = np.where(outside, 0.5 * (low + high), newton)
+
+        done = (np.abs(diff) < tol) | (np.abs(step - guess) < tol * np.maximum(guess, 1.0))
+        sigma[idx[done]] = np.where(np.abs(diff[done]) < tol, guess[done], step[done])
+        converged[idx[done]] = True
+
+        keep = ~done
+        idx, target, low, high, guess = idx[keep], target[keep], low[keep], high[keep], step[keep]
+
+    return ImpliedVolResult(sigma=sigma.reshape(shape), iterations=iterations.reshape(shape),
+                            converged=converged.reshape(shape))
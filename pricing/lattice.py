@@ -0,0 +1,243 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from pricing.ad import Var, record, sensitivities, value_of
+from pricing.black_scholes import bs_price_and_greeks
+
+
+# Lattice pricing for European and American options. Contracts are stacked
+# along the last axis, so each backward step is one NumPy operation on a
+# (nodes x contracts) array whatever the size of the batch, on slices that
+# are contiguous in memory. Only the nodes within WINDOW_STDEVS standard
+# deviations (plus the drift) of the spot are rolled back: beyond them the
+# tree carries no probability a double can hold, and a 2000-step tree spans
+# some 45 standard deviations on each side.
+
+WINDOW_STDEVS = 8.0
+
+@dataclass
+class LatticeResult:
+    """Lattice price and Greeks read off the first nodes of the tree (theta per year)."""
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+
+
+def _batch(S, K, T, r, sigma, option_type):
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)))
+    shape = arrays[0].shape
+    is_call = np.broadcast_to(np.asarray(option_type) == "call", shape)
+    # Row vectors so that every parameter broadcasts against the node axis
+    return shape, [np.ravel(x)[None, :] for x in arrays], np.ravel(is_call)[None, :]
+
+def _exercise_value(stock, K, sign):
+    return np.maximum(sign * (stock - K), 0.0)
+
+def _window(T, r, sigma, moves, steps):
+    """
+    Half-width, in up moves from the spot, of the nodes worth rolling back:
+    moves is the number of up moves in one standard deviation of the log price
+    at expiry, shifted by the drift of the contract that drifts furthest.
+    """
+    drift = np.max(np.abs(r - 0.5 * sigma ** 2) * np.sqrt(T) / sigma)
+    return int(np.ceil((WINDOW_STDEVS + drift) * moves)) if np.isfinite(drift) else steps
+
+def _binomial(S, K, T, r, sigma, sign, american, steps):
+    """Cox-Ross-Rubinstein tree."""
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1.0 / u
+    disc = np.exp(-r * dt)
+    p_up = (np.exp(r * dt) - d) / (u - d)
+    disc_up, disc_down = disc * p_up, disc * (1.0 - p_up)
+
+    # Node j of step i holds S * u^(2j - i), the same price as node j + (steps - i) / 2
+    # of the last step (or of the one before, depending on parity), so exercise
+    # values are computed once and sliced at every step.
+    j = np.arange(steps + 1)[:, None]
+    log_u = np.log(u)
+    values = _exercise_value(S * np.exp((2 * j - steps) * log_u), K, sign)
+    if american:
+        exercise = (values.copy(), _exercise_value(S * np.exp((2 * j[:-1] - steps + 1) * log_u), K, sign))
+    # Nodes with |2j - i| > reach are left as they are
+    reach = _window(T, r, sigma, np.sqrt(steps), steps)
+    saved = {steps: values.copy()}
+    up_moves = np.empty_like(values)
+    for i in range(steps - 1, -1, -1):
+        low, high = max(0, (i - reach + 1) // 2), min(i, (i + reach) // 2) + 1
+        # In place: values[j] = disc_up * values[j + 1] + disc_down * values[j]
+        live, up = values[low:high], up_moves[low:high]
+        np.multiply(values[low + 1:high + 1], disc_up, out=up)
+        live *= disc_down
+        live += up
+        if american:
+            offset = (steps - i) // 2
+            np.maximum(live, exercise[(steps - i) % 2][offset + low:offset + high], out=live)
+        if i <= 2:
+            saved[i] = values[:i + 1].copy()
+
+    s1 = S * np.vstack([d, u])
+    s2 = S * np.vstack([d * d, np.ones_like(u), u * u])
+    v1, v2 = saved[1], saved[2]
+    delta = (v1[1] - v1[0]) / (s1[1] - s1[0])
+    delta_up = (v2[2] - v2[1]) / (s2[2] - s2[1])
+    delta_down = (v2[1] - v2[0]) / (s2[1] - s2[0])
+    gamma = (delta_up - delta_down) / (0.5 * (s2[2] - s2[0]))
+    theta = (v2[1] - saved[0][0]) / (2 * dt[0])
+    return saved[0][0], delta, gamma, theta
+
+def _trinomial(S, K, T, r, sigma, sign, american, steps):
+    """Kamrad-Ritchken style trinomial tree with moves u, 1 and 1/u."""
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(2 * dt))
+    disc = np.exp(-r * dt)
+    a = np.exp(0.5 * r * dt)
+    b_up, b_down = np.exp(sigma * np.sqrt(0.5 * dt)), np.exp(-sigma * np.sqrt(0.5 * dt))
+    p_up = ((a - b_down) / (b_up - b_down)) ** 2
+    p_down = ((b_up - a) / (b_up - b_down)) ** 2
+    p_mid = 1.0 - p_up - p_down
+    disc_up, disc_mid, disc_down = disc * p_up, disc * p_mid, disc * p_down
+
+    # Node k of step i holds S * u^(k - i), the same price as node k + steps - i of the last step
+    k = np.arange(2 * steps + 1)[:, None]
+    values = _exercise_value(S * np.exp((k - steps) * np.log(u)), K, sign)
+    exercise = values.copy() if american else None
+    # Nodes with |k - i| > reach are left as they are
+    reach = _window(T, r, sigma, np.sqrt(0.5 * steps), steps)
+    saved = {steps: values.copy()}
+    mid_moves, up_moves = np.empty_like(values), np.empty_like(values)
+    for i in range(steps - 1, -1, -1):
+        low, high = max(0, i - reach), min(2 * i, i + reach) + 1
+        # In place: values[k] = disc_down * values[k] + disc_mid * values[k + 1] + disc_up * values[k + 2]
+        live, mid, up = values[low:high], mid_moves[low:high], up_moves[low:high]
+        np.multiply(values[low + 1:high + 1], disc_mid, out=mid)
+        np.multiply(values[low + 2:high + 2], disc_up, out=up)
+        live *= disc_down
+        live += mid
+        live += up
+        if american:
+            np.maximum(live, exercise[steps - i + low:steps - i + high], out=live)
+        if i <= 1:
+            saved[i] = values[:2 * i + 1].copy()
+
+    s1 = S * np.vstack([1.0 / u, np.ones_like(u), u])
+    v1 = saved[1]
+    delta = (v1[2] - v1[0]) / (s1[2] - s1[0])
+    delta_up = (v1[2] - v1[1]) / (s1[2] - s1[1])
+    delta_down = (v1[1] - v1[0]) / (s1[1] - s1[0])
+    gamma = (delta_up - delta_down) / (0.5 * (s1[2] - s1[0]))
+    theta = (v1[1] - saved[0][0]) / dt[0]
+    return saved[0][0], delta, gamma, theta
+
+def lattice_price(S, K, T, r, sigma, option_type="call", american=True, steps=500, method="binomial"):
+    """
+    Prices a batch of options on a binomial (CRR) or trinomial lattice.
+
+    Inputs broadcast like the Black-Scholes kernel; every contract shares the
+    same number of steps. american=True checks early exercise at every node.
+    Expired contracts (T <= 0) are valued at intrinsic with the kernel's expiry Greeks.
+    """
+    if steps < 2:
+        raise ValueError("The lattice needs at least 2 steps to report Greeks")
+    engines = {"binomial": _binomial, "trinomial": _trinomial}
+    if method not in engines:
+        raise ValueError(f"Unknown lattice method: {method}")
+
+    shape, (S, K, T, r, sigma), is_call = _batch(S, K, T, r, sigma, option_type)
+    expired = T[0] <= 0
+    sign = np.where(is_call, 1.0, -1.0)
+    price, delta, gamma, theta = engines[method](S, K, np.where(T > 0, T, 1.0), r, sigma, sign, american, steps)
+
+    if expired.any():
+        at_expiry = bs_price_and_greeks(S[0], K[0], 0.0, r[0], sigma[0], np.where(is_call[0], "call", "put"))
+        price = np.where(expired, at_expiry.price, price)
+        delta = np.where(expired, at_expiry.delta, delta)
+        gamma = np.where(expired, 0.0, gamma)
+        theta = np.where(expired, 0.0, theta)
+
+    return LatticeResult(price=price.reshape(shape), delta=delta.reshape(shape),
+                         gamma=gamma.reshape(shape), theta=theta.reshape(shape))
+
+def _binomial_backward(S, K, T, r, sigma, sign, american, steps):
+    """Out-of-place CRR backward induction for one contract, written to run on floats or Vars."""
+    dt = T / steps
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1.0 / u
+    disc = np.exp(-r * dt)
+    p_up = (np.exp(r * dt) - d) / (u - d)
+    disc_up, disc_down = disc * p_up, disc * (1.0 - p_up)
+
+    # S * u^k for k = -steps..steps; node j of step i sits at k = 2j - i
+    stock = S * u ** np.arange(-steps, steps + 1, dtype=float)
+    return _induction(stock, K, disc_up, disc_down, sign, american, steps)
+
+def _induction(stock, K, disc_up, disc_down, sign, american, steps):
+    """
+    Value at the root of the tree. When an input is a Var the whole loop is
+    recorded as one operation with the adjoint below, since taping its
+    ~10 operations per step would cost far more than the arithmetic.
+    """
+    s, k, du, dd = (value_of(x) for x in (stock, K, disc_up, disc_down))
+    layers, exercised = [], []
+    values = np.maximum(sign * (s[::2] - k), 0.0)
+    in_money = values > 0
+    for i in range(steps - 1, -1, -1):
+        layers.append(values)
+        values = du * values[1:] + dd * values[:-1]
+        if american:
+            intrinsic = sign * (s[steps - i:steps + i + 1:2] - k)
+            exercised.append(intrinsic > values)
+            values = np.maximum(values, intrinsic)
+    if not any(isinstance(x, Var) for x in (stock, K, disc_up, disc_down)):
+        return values[0]
+
+    def adjoints(grad):
+        """Walks the layers forward again, from the root adjoint to the terminal payoffs."""
+        stock_bar, strike_bar = np.zeros_like(s), 0.0
+        up_bar = down_bar = 0.0
+        values_bar = np.reshape(grad, 1)
+        for i in range(steps):
+            if american:
+                early = exercised[steps - 1 - i]
+                stock_bar[steps - i:steps + i + 1:2] += sign * np.where(early, values_bar, 0.0)
+                strike_bar -= sign * np.sum(values_bar[early])
+                values_bar = np.where(early, 0.0, values_bar)
+            layer = layers[steps - 1 - i]
+            up_bar += np.dot(values_bar, layer[1:])
+            down_bar += np.dot(values_bar, layer[:-1])
+            below = np.zeros(i + 2)
+            below[1:] += du * values_bar
+            below[:-1] += dd * values_bar
+            values_bar = below
+        values_bar = np.where(in_money, values_bar, 0.0)
+        stock_bar[::2] += sign * values_bar
+        strike_bar -= sign * np.sum(values_bar)
+        return stock_bar, strike_bar, up_bar, down_bar
+
+    # The backward sweep hands every operand the same adjoint: solve once, share the result
+    solved = {}
+
+    def partial(position):
+        def backward(grad):
+            if solved.get("grad") is not grad:
+                solved.update(grad=grad, adjoints=adjoints(grad))
+            return solved["adjoints"][position]
+        return backward
+    operands = (stock, K, disc_up, disc_down)
+    return record(values[0], *((x, partial(position)) for position, x in enumerate(operands)))
+
+def lattice_sensitivities(S, K, T, r, sigma, option_type="call", american=True, steps=500):
+    """
+    Binomial price of one contract and its derivatives with respect to every
+    input (S, K, T, r, sigma), from a single recorded backward induction.
+
+    Returns (price, {name: derivative}) with raw derivatives: d/dT is minus
+    the theta of lattice_price, d/dsigma and d/dr are 100 times vega and rho.
+    """
+    if T <= 0:
+        raise ValueError("Lattice sensitivities need a positive time to expiry")
+    sign = 1.0 if option_type == "call" else -1.0
+    return sensitivities(lambda S, K, T, r, sigma: _binomial_backward(S, K, T, r, sigma, sign, american, steps),
+                         ["S", "K", "T", "r", "sigma"], S=S, K=K, T=T, r=r, sigma=sigma)
@@ -0,0 +1,171 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from pricing.black_scholes import BSGreeks, _as_arrays, _scalar, bs_price_and_greeks
+from pricing.normal import norm_cdf, norm_pdf
+
+
+# Table-driven Black-Scholes. With the forward log-moneyness x = ln(S / K) + r T
+# (discounting folds into the forward) and the total volatility v = sigma sqrt(T),
+#     C = S N(d1) - K e^-rT N(d2),  d1 = x / v + v / 2,  d2 = d1 - v
+# so three float32 tables, N(d1), N(d2) and n(d1), are enough to rebuild the
+# price and every first-order Greek of calls and puts. The tables are laid on
+# the standardised moneyness z = x / v rather than on x: the fields are then
+# smooth in both coordinates at any volatility, and beyond |z| = 8 they are
+# 0 or 1 to double precision, so queries there are clamped onto the grid.
+# Expired contracts and volatilities outside the grid use the closed form.
+# With NumPy the table is not faster than bs_price_and_greeks: the gathers
+# from a table that does not fit in cache cost more than the ndtr and exp
+# they replace (benchmarks/bench_lookup.py), so no page uses it.
+
+LOOKUP_FIELDS = ["cdf_d1", "cdf_d2", "pdf_d1"]
+LOOKUP_METHODS = ["linear", "cubic"]
+
+
+@dataclass
+class BSLookupTable:
+    z_min: float
+    z_max: float
+    v_min: float
+    v_max: float
+    values: np.ndarray  # float32, (z nodes, v nodes, LOOKUP_FIELDS) with one ghost node on every side
+    # Largest interpolation error of every field measured at the cell centres, per method
+    error_bound: Dict[str, Dict[str, float]]
+
+    @property
+    def shape(self):
+        """Nodes spanning [z_min, z_max] x [v_min, v_max], ghost nodes excluded."""
+        return self.values.shape[0] - 2, self.values.shape[1] - 2
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+
+def _fields(z, v):
+    """Exact LOOKUP_FIELDS at standardised moneyness z and total volatility v, stacked on the last axis."""
+    d_1 = z + 0.5 * v
+    return np.stack([norm_cdf(d_1), norm_cdf(d_1 - v), norm_pdf(d_1)], axis=-1)
+
+def _catmull_rom_weights(t):
+    """Weights of the nodes -1, 0, 1 and 2 for a Catmull-Rom cubic at t in [0, 1]."""
+    return [((-t + 2) * t - 1) * t / 2, ((3 * t - 5) * t * t + 2) / 2, ((-3 * t + 4) * t + 1) * t / 2, (t - 1) * t * t / 2]
+
+def _interpolate(table: BSLookupTable, z, v, method):
+    """Interpolates every field at (z, v) points, clamping z onto the grid (v must be inside)."""
+    nz, nv = table.shape
+    # Fractional node positions in the padded grid, where node 1 sits on (z_min, v_min)
+    fz = (np.clip(z, table.z_min, table.z_max) - table.z_min) / (table.z_max - table.z_min) * (nz - 1) + 1
+    fv = (v - table.v_min) / (table.v_max - table.v_min) * (nv - 1) + 1
+    i = np.minimum(fz.astype(np.intp), nz - 1)
+    j = np.minimum(fv.astype(np.intp), nv - 1)
+    tz, tv = (fz - i)[:, None], (fv - j)[:, None]
+
+    if method == "linear":
+        offsets = [0, 1]
+        wz, wv = [1 - tz, tz], [1 - tv, tv]
+    else:
+        # The ghost nodes complete the 4 x 4 stencil of the edge cells
+        offsets = [-1, 0, 1, 2]
+        wz, wv = _catmull_rom_weights(tz), _catmull_rom_weights(tv)
+
+    flat = table.values.reshape(-1, len(LOOKUP_FIELDS))
+    row_length = nv + 2
+    out = np.zeros((z.size, len(LOOKUP_FIELDS)))
+    for a, weight_z in zip(offsets, wz):
+        rows = (i + a) * row_length + j
+        for b, weight_v in zip(offsets, wv):
+            out += flat[rows + b] * (weight_z * weight_v)
+    return out
+
+def build_lookup_table(n_moneyness=801, n_vol=500, moneyness_range=(-8.0, 8.0), vol_range=(0.005, 2.5)):
+    """
+    Tabulates the fields on a uniform (z, v) grid.
+
+    With steps hz and hv, linear interpolation of a field f is off by at most
+    (hz^2 max|f_zz| + hv^2 max|f_vv|) / 8; for N(d) and n(d) the second
+    derivatives are below 0.25 and 0.4, so the default grid (4.8 MB,
+    hz = 0.02, hv = 0.005) keeps every field within ~2e-5, and "cubic"
+    (Catmull-Rom, error O(h^3)) within float32 rounding (~1e-7). Prices are
+    then within (S + K e^-rT) times the cdf bound. The errors actually
+    measured at every cell centre are stored in error_bound.
+    """
+    z = np.linspace(*moneyness_range, n_moneyness)
+    v = np.linspace(*vol_range, n_vol)
+    z_nodes = np.concatenate([[2 * z[0] - z[1]], z, [2 * z[-1] - z[-2]]])
+    v_nodes = np.concatenate([[2 * v[0] - v[1]], v, [2 * v[-1] - v[-2]]])  # The lower ghost may be v = 0, where d1 = z
+    values = _fields(z_nodes[:, None], v_nodes[None, :]).astype(np.float32)
+    table = BSLookupTable(z_min=float(z[0]), z_max=float(z[-1]), v_min=float(v[0]), v_max=float(v[-1]),
+                          values=values, error_bound={})
+
+    z_mid, v_mid = np.meshgrid(0.5 * (z[1:] + z[:-1]), 0.5 * (v[1:] + v[:-1]), indexing="ij")
+    exact = _fields(z_mid.ravel(), v_mid.ravel())
+    for method in LOOKUP_METHODS:
+        error = np.abs(_interpolate(table, z_mid.ravel(), v_mid.ravel(), method) - exact).max(axis=0)
+        table.error_bound[method] = dict(zip(LOOKUP_FIELDS, map(float, error)))
+    return table
+
+def save_lookup_table(table: BSLookupTable, path):
+    """Writes the values as a raw .npy file (memory-mappable) and the grid next to it as .json."""
+    path = Path(path).with_suffix(".npy")
+    np.save(path, table.values)
+    grid = {"z_min": table.z_min, "z_max": table.z_max, "v_min": table.v_min, "v_max": table.v_max,
+            "error_bound": table.error_bound}
+    path.with_suffix(".json").write_text(json.dumps(grid, indent=2))
+
+def load_lookup_table(path, mmap=True) -> BSLookupTable:
+    """Reads a table written by save_lookup_table; with mmap the values stay on disk until touched."""
+    path = Path(path).with_suffix(".npy")
+    grid = json.loads(path.with_suffix(".json").read_text())
+    values = np.load(path, mmap_mode="r" if mmap else None)
+    if values.dtype != np.float32 or values.ndim != 3 or values.shape[2] != len(LOOKUP_FIELDS):
+        raise ValueError(f"{path} is not a Black-Scholes lookup table")
+    return BSLookupTable(values=values, **grid)
+
+def lookup_price_and_greeks(table: BSLookupTable, S, K, T, r, sigma, option_type="call", method="linear"):
+    """
+    Same inputs and outputs as bs_price_and_greeks, read from the table.
+
+    Contracts whose total volatility falls outside the grid, or that are
+    expired, are priced by the closed form so the result is always defined.
+    """
+    if method not in LOOKUP_METHODS:
+        raise ValueError(f"Unknown interpolation method: {method}")
+    S, K, T, r, sigma = _as_arrays(S, K, T, r, sigma)
+    option_type = np.asarray(option_type)
+    S, K, T, r, sigma, option_type = np.broadcast_arrays(S, K, T, r, sigma, option_type)
+    shape = S.shape
+    S, K, T, r, sigma, option_type = (np.ravel(a) for a in (S, K, T, r, sigma, option_type))
+
+    sqrt_T = np.sqrt(np.maximum(T, 0.0))
+    x = np.log(S / K) + r * T
+    v = sigma * sqrt_T
+    inside = (T > 0) & (v >= table.v_min) & (v <= table.v_max)
+
+    greeks = {name: np.empty(S.size) for name in ["price", "delta", "gamma", "theta", "vega", "rho"]}
+    if inside.any():
+        inside = slice(None) if inside.all() else inside  # Skips the masked copies in the common case
+        s, k, t, rate, vol, sq = S[inside], K[inside], T[inside], r[inside], sigma[inside], sqrt_T[inside]
+        cdf_d1, cdf_d2, pdf_d1 = _interpolate(table, x[inside] / v[inside], v[inside], method).T
+        is_call = option_type[inside] == "call"
+        K_disc = k * np.exp(-rate * t)
+        call = s * cdf_d1 - K_disc * cdf_d2
+        time_decay = -s * pdf_d1 * vol / (2 * sq)
+        greeks["price"][inside] = np.where(is_call, call, call - s + K_disc)
+        greeks["delta"][inside] = np.where(is_call, cdf_d1, cdf_d1 - 1.0)
+        greeks["gamma"][inside] = pdf_d1 / (s * vol * sq)
+        greeks["theta"][inside] = np.where(is_call, time_decay - rate * K_disc * cdf_d2,
+                                           time_decay + rate * K_disc * (1.0 - cdf_d2))
+        greeks["vega"][inside] = s * sq * pdf_d1 / 100
+        greeks["rho"][inside] = np.where(is_call, K_disc * t * cdf_d2, -K_disc * t * (1.0 - cdf_d2)) / 100
+    if isinstance(inside, np.ndarray) and not inside.all():
+        outside = ~inside
+        exact = bs_price_and_greeks(S[outside], K[outside], T[outside], r[outside], sigma[outside], option_type[outside])
+        for name in greeks:
+            greeks[name][outside] = getattr(exact, name)
+
+    return BSGreeks(**{name: _scalar(values.reshape(shape)) for name, values in greeks.items()})
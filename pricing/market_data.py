@@ -0,0 +1,338 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from pricing.providers import MarketDataProvider, lookback_start, make_provider, naive_dates
+
+
+# Cached access to price history. Every Streamlit rerun used to go to Yahoo
+# Finance for the same bars; each (ticker, interval) now has one local history
+# that only grows: a process-wide dictionary shared by every session, backed by
+# a Parquet file (plus a small .json sidecar) that survives restarts. Periods
+# and date ranges ("60d", "1y", "5y", start/end) are slices of that history.
+# When it is older than the TTL the slice is still returned immediately while
+# a background thread downloads the bars after the last one held; a longer
+# lookback than stored downloads only the missing head. In offline mode
+# nothing is downloaded and the stored histories are served as they are.
+
+DEFAULT_TTL = float(os.environ.get("MARKET_DATA_TTL", 15 * 60))  # Seconds
+DEFAULT_FOLDER = Path(os.environ.get("MARKET_DATA_DIR", Path(__file__).resolve().parent.parent / "data" / "market_data"))
+OFFLINE = os.environ.get("MARKET_DATA_OFFLINE", "0").lower() not in ("", "0", "false", "no")
+
+LOOKBACKS = ["60d", "1y", "5y"]
+BATCH_SIZE = 100  # Tickers per request in histories()
+# Corporate actions, reported by yfinance next to the bars. A new one means the
+# adjusted prices already stored were restated.
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+
+
+@dataclass
+class MarketDataStats:
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    stale_served: int     # Hits older than the TTL, returned while a refresh runs
+    refreshes: int        # Background refreshes that completed
+    refresh_errors: int   # Background refreshes that failed; the stale copy stays in place
+    bars_fetched: int     # Rows downloaded, all requests included
+    reloads: int          # Full downloads after a split, dividend or price revision
+    offline: bool
+
+    @property
+    def hit_rate(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+@dataclass
+class _Stored:
+    frame: pd.DataFrame               # Sorted by date, one row per bar
+    checked_at: float                 # Last time the latest bars were downloaded
+    covers_from: Optional[pd.Timestamp]  # Every bar since this date is held; None when from the listing
+
+
+def _date(timestamp):
+    return f"{timestamp:%Y-%m-%d}"
+
+def _slice(frame, first, end):
+    """Bars from first (included) to end (excluded), as a view of the stored frame."""
+    index = naive_dates(frame.index)
+    lo = 0 if first is None else index.searchsorted(first)
+    hi = len(frame) if end is None else index.searchsorted(pd.Timestamp(end))
+    return frame.iloc[lo:hi]
+
+def _tail_anchor(frame):
+    """Date from which to download new bars: the last one may have been stored mid-session, so the one before."""
+    return naive_dates(frame.index[-2:])[0]
+
+def _covers(stored, first):
+    return stored.covers_from is None or (first is not None and first >= stored.covers_from)
+
+def _revised(stored, fresh):
+    """
+    Whether fresh bars contradict the stored ones: a close that moved on a bar
+    both hold (the last stored bar may have been partial and is not compared),
+    or a split or dividend the store has not seen.
+    """
+    overlap = stored.index[:-1].intersection(fresh.index)
+    if len(overlap) and not np.allclose(stored.loc[overlap, "Close"], fresh.loc[overlap, "Close"], rtol=1e-6):
+        return True
+    columns = [column for column in ACTION_COLUMNS if column in fresh]
+    if not columns:
+        return False
+    actions = fresh[columns].fillna(0.0)
+    known = stored[columns].reindex(fresh.index).fillna(0.0) if set(columns) <= set(stored) else 0.0
+    return bool(((actions != 0) & (actions != known)).to_numpy().any())
+
+
+class MarketDataCache:
+    """
+    Incrementally refreshed price histories in two tiers (memory, Parquet), safe to share between threads.
+
+    Bars come from provider (pricing.providers; Yahoo Finance unless
+    MARKET_DATA_PROVIDER says otherwise), whose clock also dates the
+    lookbacks. Returned frames are shared by every caller and must not be
+    mutated.
+    """
+
+    def __init__(self, folder=DEFAULT_FOLDER, ttl=DEFAULT_TTL, offline=OFFLINE, provider: MarketDataProvider = None):
+        self.folder = Path(folder)
+        self.ttl = ttl
+        self.offline = offline
+        self.provider = make_provider() if provider is None else provider
+        self._memory = {}  # (ticker, interval) -> _Stored
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._key_locks = defaultdict(threading.Lock)  # Serializes the updates of one history
+        self._memory_hits = self._disk_hits = self._misses = 0
+        self._stale_served = self._refreshes = self._refresh_errors = 0
+        self._bars_fetched = self._reloads = 0
+
+    def path(self, key):
+        name = re.sub(r"[^A-Za-z0-9.=^_-]", "-", "_".join(key))
+        return self.folder / f"{name}.parquet"
+
+    def _read_disk(self, key):
+        path = self.path(key)
+        try:
+            frame = pd.read_parquet(path)
+            meta = json.loads(path.with_suffix(".json").read_text())
+        except FileNotFoundError:
+            return None
+        covers_from = meta.get("covers_from")
+        return _Stored(frame, meta["checked_at"], None if covers_from is None else pd.Timestamp(covers_from))
+
+    def _write_disk(self, key, stored):
+        path = self.path(key)
+        meta = {"checked_at": stored.checked_at,
+                "covers_from": None if stored.covers_from is None else _date(stored.covers_from)}
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            # Written next to the target then renamed, so readers never see half a file
+            partial = path.with_suffix(f".{threading.get_ident()}.tmp")
+            stored.frame.to_parquet(partial)
+            os.replace(partial, path)
+            path.with_suffix(".json").write_text(json.dumps(meta))
+        except OSError:
+            pass  # A read-only folder only costs the disk tier
+
+    def _clean(self, frame):
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        with self._lock:
+            self._bars_fetched += len(frame)
+        return frame
+
+    def _fetch(self, key, **span):
+        ticker, interval = key
+        return self._clean(self.provider.history(ticker, interval, **span))
+
+    def _fetch_many(self, tickers, interval, batch_size, **span):
+        frames = {}
+        for i in range(0, len(tickers), batch_size):
+            batch = self.provider.histories(tickers[i:i + batch_size], interval, **span)
+            frames.update((ticker, self._clean(frame)) for ticker, frame in batch.items())
+        return frames
+
+    def _store(self, key, stored):
+        with self._lock:
+            self._memory[key] = stored
+        self._write_disk(key, stored)
+        return stored
+
+    def _download(self, key, first):
+        """Whole history from first (from the listing when None)."""
+        frame = self._fetch(key, period="max") if first is None else self._fetch(key, start=_date(first))
+        return _Stored(frame, time.time(), first)
+
+    def _extend_head(self, key, first):
+        """Prepends the bars between first and the oldest one held."""
+        with self._key_locks[key]:
+            stored = self._memory[key]
+            if _covers(stored, first):
+                return stored  # Done by another session meanwhile
+            if first is None or stored.frame.empty:
+                return self._store(key, self._download(key, first))
+            oldest = stored.frame.index[0]
+            older = self._fetch(key, start=_date(first), end=_date(naive_dates(stored.frame.index[:1])[0]))
+            frame = pd.concat([older[older.index < oldest], stored.frame])
+            return self._store(key, _Stored(frame, stored.checked_at, first))
+
+    def _appended(self, key, stored, fresh):
+        """
+        stored followed by the fresh tail bars; when they show that the
+        adjusted history was restated, the whole stored span downloaded again.
+        """
+        if fresh.empty:
+            return _Stored(stored.frame, time.time(), stored.covers_from)
+        if _revised(stored.frame, fresh):
+            with self._lock:
+                self._reloads += 1
+            return self._download(key, stored.covers_from)
+        frame = pd.concat([stored.frame[stored.frame.index < fresh.index[0]], fresh])
+        return _Stored(frame, time.time(), stored.covers_from)
+
+    def _extend_tail(self, key):
+        """Downloads the bars from the last complete one held onwards and appends them."""
+        with self._key_locks[key]:
+            stored = self._memory[key]
+            if stored.frame.empty:
+                return self._store(key, self._download(key, stored.covers_from))
+            fresh = self._fetch(key, start=_date(_tail_anchor(stored.frame)))
+            return self._store(key, self._appended(key, stored, fresh))
+
+    def _refresh(self, key):
+        try:
+            self._extend_tail(key)
+            with self._lock:
+                self._refreshes += 1
+        except Exception:
+            with self._lock:
+                self._refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def history(self, ticker, period=None, interval="1d", start=None, end=None):
+        """
+        Price history of a ticker for a yfinance period ("1d", "60d", "1y"...)
+        or from a start (to an optional, excluded, end) date.
+
+        Raises LookupError in offline mode when nothing is stored for the ticker.
+        """
+        if period is None and start is None:
+            raise ValueError("Give either a period or a start date")
+        key = ticker.upper(), interval
+        first = pd.Timestamp(start) if start is not None else lookback_start(period, self.provider.now())
+        stored = self._lookup(key)
+        if stored is None:
+            if self.offline:
+                raise LookupError(f"No stored {interval} history for {key[0]} in offline mode")
+            with self._key_locks[key]:
+                stored = self._memory.get(key) or self._store(key, self._download(key, first))
+            return _slice(stored.frame, first, end)
+        if self.offline:
+            return _slice(stored.frame, first, end)
+
+        if not _covers(stored, first):
+            stored = self._extend_head(key, first)
+        if time.time() - stored.checked_at > self.ttl:
+            with self._lock:
+                self._stale_served += 1
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if start_refresh:
+                threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+        return _slice(stored.frame, first, end)
+
+    def histories(self, tickers, period=None, interval="1d", start=None, end=None, batch_size=BATCH_SIZE):
+        """
+        Histories of many tickers as {ticker: frame}, for a period or from a
+        start date like history(). Tickers never seen (or held over a shorter
+        span) are downloaded together, batch_size per request, and so are the
+        new bars of the stale ones; unlike history() the refresh is waited for.
+        Tickers without data are left out.
+        """
+        if period is None and start is None:
+            raise ValueError("Give either a period or a start date")
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        first = pd.Timestamp(start) if start is not None else lookback_start(period, self.provider.now())
+        stored = {ticker: self._lookup((ticker, interval)) for ticker in tickers}
+
+        if not self.offline:
+            missing = [ticker for ticker, held in stored.items() if held is None or not _covers(held, first)]
+            span = {"period": "max"} if first is None else {"start": _date(first)}
+            for ticker, frame in self._fetch_many(missing, interval, batch_size, **span).items():
+                key = ticker, interval
+                with self._key_locks[key]:
+                    held = self._memory.get(key)
+                    if held is not None and _covers(held, first):
+                        stored[ticker] = held  # Done by another session meanwhile
+                    else:
+                        stored[ticker] = self._store(key, _Stored(frame, time.time(), first))
+
+            now = time.time()
+            stale = [ticker for ticker, held in stored.items()
+                     if ticker not in missing and held is not None and now - held.checked_at > self.ttl]
+            if stale:
+                # One request from the earliest anchor; each ticker keeps the bars it needs
+                anchor = min(_tail_anchor(stored[ticker].frame) for ticker in stale)
+                fresh = self._fetch_many(stale, interval, batch_size, start=_date(anchor))
+                for ticker in stale:
+                    key = ticker, interval
+                    # Same lock as the background refresh of history(), which may hold newer bars by now
+                    with self._key_locks[key]:
+                        held = self._memory.get(key, stored[ticker])
+                        if held.checked_at > stored[ticker].checked_at:
+                            stored[ticker] = held
+                        else:
+                            stored[ticker] = self._store(key, self._appended(key, held, fresh.get(ticker, pd.DataFrame())))
+                with self._lock:
+                    self._refreshes += len(stale)
+        return {ticker: _slice(held.frame, first, end) for ticker, held in stored.items()
+                if held is not None and not held.frame.empty}
+
+    def _lookup(self, key):
+        """Stored history of a key from memory, then disk; None when neither has it."""
+        with self._lock:
+            stored = self._memory.get(key)
+            if stored is not None:
+                self._memory_hits += 1
+                return stored
+        stored = self._read_disk(key)
+        with self._lock:
+            if stored is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            return self._memory.setdefault(key, stored)
+
+    def clear(self, disk=False):
+        """Empties the memory tier (and the stored files with disk=True) and resets the counters."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_hits = self._disk_hits = self._misses = 0
+            self._stale_served = self._refreshes = self._refresh_errors = 0
+            self._bars_fetched = self._reloads = 0
+        if disk:
+            for path in [*self.folder.glob("*.parquet"), *self.folder.glob("*.json")]:
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> MarketDataStats:
+        with self._lock:
+            return MarketDataStats(memory_hits=self._memory_hits, disk_hits=self._disk_hits, misses=self._misses,
+                                   stale_served=self._stale_served, refreshes=self._refreshes,
+                                   refresh_errors=self._refresh_errors, bars_fetched=self._bars_fetched,
+                                   reloads=self._reloads, offline=self.offline)
+
+
+# Shared by every page and session of the server process
+MARKET_DATA = MarketDataCache()
@@ -0,0 +1,120 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from numbers import Integral, Real
+
+
+# Process-wide memoization for pricing calls. Streamlit runs every session as
+# a thread of the same server process, so a module-level cache is shared by
+# all users: the first view of a contract pays for the computation and every
+# later rerun or session reading the same inputs gets the stored result.
+# Float arguments are quantized to a number of significant digits so that
+# slider round-trips (0.1 + 0.2, days / 365) land on the same key.
+
+DEFAULT_MAXSIZE = int(os.environ.get("PRICING_CACHE_SIZE", 4096))
+DEFAULT_DIGITS = int(os.environ.get("PRICING_CACHE_DIGITS", 10))
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    bypassed: int   # Calls with arguments that cannot be keyed (arrays, frames...)
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PricingCache:
+    """
+    Size-bounded LRU cache keyed on quantized arguments, safe to share between threads.
+
+    Cached values are returned as-is to every caller and must not be mutated.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, digits=DEFAULT_DIGITS):
+        if maxsize < 1:
+            raise ValueError("The cache needs room for at least one entry")
+        self.maxsize = maxsize
+        self.digits = digits
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._bypassed = 0
+
+    def _quantize(self, value):
+        """Hashable, quantized form of one argument; raises TypeError when it cannot be part of a key."""
+        if isinstance(value, (bool, Integral, str, type(None))):
+            return value
+        if isinstance(value, Real):
+            return float(f"{float(value):.{self.digits}g}")
+        if isinstance(value, tuple):
+            return tuple(self._quantize(item) for item in value)
+        raise TypeError(f"Cannot key on {type(value).__name__}")
+
+    def make_key(self, func, args, kwargs):
+        """Cache key of a call, or None when an argument is not keyable (arrays, frames...)."""
+        try:
+            parts = tuple(self._quantize(arg) for arg in args)
+            named = tuple((name, self._quantize(value)) for name, value in sorted(kwargs.items()))
+        except TypeError:
+            return None
+        return (func.__module__, func.__qualname__, parts, named)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+        # Computed outside the lock so that slow engines do not block other sessions
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def memoize(self, func):
+        """Decorator caching func on its quantized arguments; unkeyable calls run uncached."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = self.make_key(func, args, kwargs)
+            if key is None:
+                with self._lock:
+                    self._bypassed += 1
+                return func(*args, **kwargs)
+            return self.get_or_compute(key, lambda: func(*args, **kwargs))
+        wrapper.cache = self
+        return wrapper
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._bypassed = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions,
+                              bypassed=self._bypassed, size=len(self._entries), maxsize=self.maxsize)
+
+
+# Shared by every page and session of the server process
+PRICING_CACHE = PricingCache()
+memoize = PRICING_CACHE.memoize
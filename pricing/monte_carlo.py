@@ -0,0 +1,191 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from pricing.ad import sensitivities
+from pricing.black_scholes import bs_price_and_greeks
+from pricing.strategies import StrategyOption
+
+
+# Monte Carlo valuation of StrategyOption legs under geometric Brownian motion.
+# Paths are simulated in fixed-size chunks so memory does not grow with the
+# number of paths; each chunk only returns running sums, which are merged at
+# the end. Every chunk gets its own seed spawned from one SeedSequence, so the
+# result does not depend on how many worker processes run the chunks.
+
+PAYOFF_STYLES = ["european", "asian"]
+CHUNK_ELEMENTS = 2_000_000  # Draws per chunk when chunk_size is not given (~16 MB per float64 array)
+PILOT_PATHS = 10_000  # Separate paths that estimate the control variate coefficient
+
+
+@dataclass
+class MonteCarloResult:
+    price: float
+    std_error: float
+    n_paths: int
+    elapsed: float        # Wall time in seconds
+    paths_per_sec: float
+
+
+def _leg_payoffs(legs, underlying):
+    """Payoff at expiry of every leg for an array of underlying values (stock legs pay the underlying)."""
+    total = np.zeros_like(underlying)
+    for leg in legs:
+        if leg.type == "stock":
+            payoff = underlying
+        elif leg.type == "call":
+            payoff = np.maximum(underlying - leg.strike, 0.0)
+        else:  # put
+            payoff = np.maximum(leg.strike - underlying, 0.0)
+        # Out of place so that underlying may be a Var (pricing.ad)
+        total = total + payoff * leg.quantity * (1 if leg.position == "long" else -1)
+    return total
+
+def _legs_value(legs, S, T, r, sigma):
+    """Closed-form value of the legs when held as European contracts (the control variate's mean)."""
+    value = 0.0
+    for leg in legs:
+        if leg.type == "stock":
+            leg_value = S
+        else:
+            leg_value = bs_price_and_greeks(S, leg.strike, T, r, sigma, leg.type).price
+        value += leg_value * leg.quantity * (1 if leg.position == "long" else -1)
+    return float(value)
+
+def _simulate_chunk(legs, S, T, r, sigma, payoff_style, n_paths, n_steps, antithetic, seed):
+    """Simulates one chunk and returns (n, sum y, sum x, sum xy, sum xx, sum yy)."""
+    rng = np.random.default_rng(seed)
+    dt = T / n_steps
+    n_draws = n_paths // 2 if antithetic else n_paths
+    z = rng.standard_normal((n_draws, n_steps))
+    if antithetic:
+        z = np.concatenate([z, -z])
+
+    log_paths = np.cumsum((r - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z, axis=1)
+    paths = S * np.exp(log_paths)
+    terminal = paths[:, -1]
+    underlying = paths.mean(axis=1) if payoff_style == "asian" else terminal
+
+    discount = np.exp(-r * T)
+    y = discount * _leg_payoffs(legs, underlying)
+    # Control variate: the same legs held as European contracts for an Asian
+    # payoff; for a European payoff those are y itself, so the terminal price is used
+    x = discount * (_leg_payoffs(legs, terminal) if payoff_style == "asian" else terminal)
+    if antithetic:
+        # A path and its mirror form one sample
+        y = 0.5 * (y[:n_draws] + y[n_draws:])
+        x = 0.5 * (x[:n_draws] + x[n_draws:])
+    return np.array([y.size, y.sum(), x.sum(), (x * y).sum(), (x * x).sum(), (y * y).sum()])
+
+def _chunk_sizes(n_paths, chunk_size, antithetic):
+    """Paths per chunk (the last one may be smaller) and the total, even when antithetic."""
+    if antithetic:
+        # Paths come in mirrored pairs
+        n_paths, chunk_size = n_paths + n_paths % 2, chunk_size + chunk_size % 2
+    chunk_size = min(chunk_size, n_paths)
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    return sizes, n_paths
+
+def monte_carlo_price(legs: List[StrategyOption], S, T, r, sigma, payoff_style="european",
+                      n_paths=1_000_000, n_steps=1, chunk_size=None, antithetic=True,
+                      control_variate=True, workers=1, seed=0) -> MonteCarloResult:
+    """
+    Prices a set of legs by Monte Carlo.
+
+    payoff_style "european" pays on the terminal price, "asian" on the
+    arithmetic average over the n_steps monitoring dates. With control_variate
+    the discounted terminal price (mean S) is used as control for the European
+    style, and the European value of the same legs (Black-Scholes) for the
+    Asian style. Its coefficient is estimated on PILOT_PATHS separate paths,
+    so that it is independent of the priced ones and the price stays unbiased.
+    workers > 1 spreads the chunks across a process pool.
+    """
+    if payoff_style not in PAYOFF_STYLES:
+        raise ValueError(f"Unknown payoff style: {payoff_style}")
+    if chunk_size is None:
+        chunk_size = max(1_000, CHUNK_ELEMENTS // n_steps)
+    sizes, n_paths = _chunk_sizes(n_paths, chunk_size, antithetic)
+    # One seed per chunk, and the last one for the pilot paths
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes) + 1)
+    args = [(legs, S, T, r, sigma, payoff_style, size, n_steps, antithetic, chunk_seed)
+            for size, chunk_seed in zip(sizes, seeds)]
+
+    start = time.perf_counter()
+    beta = 0.0
+    if control_variate:
+        pilot_n, pilot_y, pilot_x, pilot_xy, pilot_xx, _ = _simulate_chunk(
+            legs, S, T, r, sigma, payoff_style, min(PILOT_PATHS, n_paths), n_steps, antithetic, seeds[-1])
+        pilot_var_x = pilot_xx / pilot_n - (pilot_x / pilot_n) ** 2
+        if pilot_var_x > 0:
+            beta = (pilot_xy / pilot_n - pilot_x * pilot_y / pilot_n ** 2) / pilot_var_x
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) as pool:
+            sums = sum(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        sums = sum(_simulate_chunk(*chunk_args) for chunk_args in args)
+    elapsed = time.perf_counter() - start
+
+    n, sum_y, sum_x, sum_xy, sum_xx, sum_yy = sums
+    mean_y, mean_x = sum_y / n, sum_x / n
+    var_y = max(sum_yy / n - mean_y ** 2, 0.0)
+    var_x = max(sum_xx / n - mean_x ** 2, 0.0)
+    cov_xy = sum_xy / n - mean_x * mean_y
+
+    price, variance = mean_y, var_y
+    if beta != 0.0:
+        control_mean = _legs_value(legs, S, T, r, sigma) if payoff_style == "asian" else S
+        price = mean_y - beta * (mean_x - control_mean)
+        variance = max(var_y - 2 * beta * cov_xy + beta ** 2 * var_x, 0.0)
+
+    return MonteCarloResult(price=float(price), std_error=float(np.sqrt(variance / n)), n_paths=n_paths,
+                            elapsed=elapsed, paths_per_sec=n_paths / elapsed if elapsed > 0 else float("inf"))
+
+def _pathwise_chunk_sum(legs, S, T, r, sigma, payoff_style, n_paths, n_steps, antithetic, seed):
+    """Sum of the discounted payoffs of one chunk, written to run on floats or Vars."""
+    rng = np.random.default_rng(seed)
+    n_draws = n_paths // 2 if antithetic else n_paths
+    z = rng.standard_normal((n_draws, n_steps))
+    if antithetic:
+        z = np.concatenate([z, -z])
+
+    dt = T / n_steps
+    paths = S * np.exp(np.cumsum((r - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z, axis=1))
+    underlying = paths.mean(axis=1) if payoff_style == "asian" else paths[:, -1]
+    return np.sum(np.exp(-r * T) * _leg_payoffs(legs, underlying))
+
+def monte_carlo_greeks(legs: List[StrategyOption], S, T, r, sigma, payoff_style="european",
+                       n_paths=200_000, n_steps=1, chunk_size=None, antithetic=True, seed=0):
+    """
+    Price and pathwise delta, theta, vega and rho of a set of legs (kernel units).
+
+    The simulation runs once under pricing.ad, so all four sensitivities come
+    from the same paths at a small multiple of the cost of the price, with no
+    bump noise. Pathwise derivatives need payoffs continuous in the
+    underlying, which holds for every StrategyOption leg.
+    """
+    if payoff_style not in PAYOFF_STYLES:
+        raise ValueError(f"Unknown payoff style: {payoff_style}")
+    if chunk_size is None:
+        # The recorded operations of a chunk stay alive until its backward sweep
+        chunk_size = max(1_000, CHUNK_ELEMENTS // (5 * n_steps))
+    sizes, n_paths = _chunk_sizes(n_paths, chunk_size, antithetic)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    names = ["S", "T", "r", "sigma"]
+    price, grad = 0.0, dict.fromkeys(names, 0.0)
+    for size, chunk_seed in zip(sizes, seeds):
+        chunk_price, chunk_grad = sensitivities(
+            lambda S, T, r, sigma: _pathwise_chunk_sum(legs, S, T, r, sigma, payoff_style, size, n_steps,
+                                                       antithetic, chunk_seed),
+            names, S=S, T=T, r=r, sigma=sigma)
+        price += chunk_price / n_paths
+        for name in names:
+            grad[name] += chunk_grad[name] / n_paths
+    return {"price": price, "delta": grad["S"], "theta": -grad["T"],
+            "vega": grad["sigma"] / 100, "rho": grad["r"] / 100}
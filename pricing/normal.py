@@ -0,0 +1,31 @@
+import math
+
+import numpy as np
+from scipy.special import ndtr
+
+from pricing.ad import as_float_array
+
+
+# Standard normal CDF/PDF without going through scipy.stats.norm, whose
+# rv_continuous argument checking costs far more than the math on small inputs.
+
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+INV_SQRT_2 = 1.0 / math.sqrt(2.0)
+
+
+def norm_cdf(x):
+    """Standard normal CDF of a scalar or array (scipy.special.ndtr)."""
+    return ndtr(x)
+
+def norm_pdf(x):
+    """Standard normal PDF of a scalar or array."""
+    x = as_float_array(x)
+    return np.exp(-0.5 * x * x) * INV_SQRT_2PI
+
+def norm_cdf_scalar(x):
+    """Standard normal CDF of a single Python float through math.erfc."""
+    return 0.5 * math.erfc(-x * INV_SQRT_2)
+
+def norm_pdf_scalar(x):
+    """Standard normal PDF of a single Python float."""
+    return math.exp(-0.5 * x * x) * INV_SQRT_2PI
@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from pricing.black_scholes import HIGHER_ORDER_GREEKS, calculate_greeks
+from pricing.strategies import StrategyOption
+
+
+# Column-oriented book of positions. Every field is one NumPy array with an
+# entry per position (categorical fields are stored as small integer codes),
+# so a book of N positions takes about 30 N bytes. Risk is computed in a
+# single vectorized sweep over fixed-size blocks, which keeps the kernel's
+# temporaries bounded whatever the size of the book, and aggregated with
+# np.bincount on the integer codes.
+
+POSITION_TYPES = ["call", "put", "stock"]
+BOOK_GREEKS = ["price", "delta", "gamma", "theta", "vega", "rho"]
+EXPIRY_BUCKET_DAYS = [7, 30, 90, 180, 365, 730]  # Upper bound (inclusive) of every bucket but the last
+EXPIRY_BUCKETS = ["<= 1W", "1W-1M", "1M-3M", "3M-6M", "6M-1Y", "1Y-2Y", "> 2Y"]
+BLOCK_SIZE = 65_536  # Positions priced per kernel call
+
+
+@dataclass
+class PositionBook:
+    underlyings: List[str]     # Underlying names, indexed by the underlying codes
+    underlying: np.ndarray     # int32 code into underlyings
+    type: np.ndarray           # int8 code into POSITION_TYPES
+    strike: np.ndarray         # float64
+    days_to_expiry: np.ndarray  # float64
+    quantity: np.ndarray       # float64
+    sign: np.ndarray           # int8, +1 long / -1 short
+
+    @classmethod
+    def from_columns(cls, underlying, type, strike, days_to_expiry, quantity, sign=1):
+        """
+        Builds a book from aligned columns.
+
+        underlying and type hold names ("call", "put", "stock"); sign is +1/-1
+        or "long"/"short" and broadcasts, like every numeric column.
+        """
+        underlyings, underlying_codes = np.unique(np.asarray(underlying), return_inverse=True)
+        type_codes = pd.Categorical(np.asarray(type), categories=POSITION_TYPES).codes
+        if (type_codes < 0).any():
+            raise ValueError(f"Position types must be one of {POSITION_TYPES}")
+        sign = np.asarray(sign)
+        if sign.dtype.kind in "US":
+            sign = np.where(sign == "short", -1, 1)
+        size = underlying_codes.size
+        return cls(
+            underlyings=underlyings.tolist(),
+            underlying=underlying_codes.astype(np.int32),
+            type=type_codes.astype(np.int8),
+            strike=np.broadcast_to(np.asarray(strike, dtype=float), size).copy(),
+            days_to_expiry=np.broadcast_to(np.asarray(days_to_expiry, dtype=float), size).copy(),
+            quantity=np.broadcast_to(np.asarray(quantity, dtype=float), size).copy(),
+            sign=np.broadcast_to(sign.astype(np.int8), size).copy(),
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame):
+        """Builds a book from a DataFrame with the from_columns column names."""
+        return cls.from_columns(*(frame[name].to_numpy() for name in
+                                  ["underlying", "type", "strike", "days_to_expiry", "quantity", "sign"]))
+
+    @classmethod
+    def from_legs(cls, legs: List[StrategyOption], underlying, days_to_expiry):
+        """Builds a book from the legs of a strategy on a single underlying."""
+        return cls.from_columns([underlying] * len(legs), [leg.type for leg in legs], [leg.strike for leg in legs],
+                                days_to_expiry, [leg.quantity for leg in legs], [leg.position for leg in legs])
+
+    def __len__(self):
+        return self.underlying.size
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in
+                   ["underlying", "type", "strike", "days_to_expiry", "quantity", "sign"])
+
+    def expiry_bucket(self):
+        """int8 code into EXPIRY_BUCKETS for every position."""
+        return np.searchsorted(EXPIRY_BUCKET_DAYS, self.days_to_expiry, side="left").astype(np.int8)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "underlying": pd.Categorical.from_codes(self.underlying, categories=self.underlyings),
+            "type": pd.Categorical.from_codes(self.type, categories=POSITION_TYPES),
+            "strike": self.strike,
+            "days_to_expiry": self.days_to_expiry,
+            "quantity": self.quantity,
+            "sign": self.sign,
+        })
+
+
+@dataclass
+class BookRisk:
+    """
+    Signed, quantity-weighted price and Greeks in the Pricer's units (daily theta, vega and rho per 1%).
+
+    With higher_order the HIGHER_ORDER_GREEKS are included too (charm and color per day).
+    """
+    position: Dict[str, np.ndarray]  # One array per Greek, aligned with the book
+    by_underlying: pd.DataFrame
+    by_expiry: pd.DataFrame
+    total: Dict[str, float]
+
+
+def _per_underlying(values, book, name):
+    """Accepts a scalar, a {underlying: value} mapping or an array aligned with book.underlyings."""
+    if isinstance(values, dict):
+        missing = set(book.underlyings) - set(values)
+        if missing:
+            raise ValueError(f"Missing {name} for: {', '.join(sorted(missing))}")
+        values = [values[u] for u in book.underlyings]
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0:
+        values = np.full(len(book.underlyings), float(values))
+    return values
+
+def position_greeks(book: PositionBook, spots, r, sigma, sigma_per_position=False, higher_order=False):
+    """
+    Signed, quantity-weighted price and Greeks of every position.
+
+    spots and sigma are given per underlying (see _per_underlying), or sigma
+    holds one volatility per position when sigma_per_position is set. Stock
+    positions are worth the spot with a delta of one.
+    """
+    spots = _per_underlying(spots, book, "spots")
+    if sigma_per_position:
+        position_sigma = np.broadcast_to(np.asarray(sigma, dtype=float), len(book))
+    else:
+        position_sigma = None
+        vols = _per_underlying(sigma, book, "volatility")
+
+    type_names = np.array(POSITION_TYPES)
+    names = BOOK_GREEKS + (HIGHER_ORDER_GREEKS if higher_order else [])
+    out = {name: np.empty(len(book)) for name in names}
+    for start in range(0, len(book), BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        codes = book.underlying[block]
+        S = spots[codes]
+        vol = position_sigma[block] if position_sigma is not None else vols[codes]
+        is_stock = book.type[block] == POSITION_TYPES.index("stock")
+        # Stock rows are overwritten below; an at-the-money strike keeps the kernel finite on them
+        strike = np.where(is_stock, S, book.strike[block])
+        greeks = calculate_greeks(S, strike, book.days_to_expiry[block] / 365.0, r, vol,
+                                  type_names[book.type[block]], higher_order)
+
+        weight = book.quantity[block] * book.sign[block]
+        for name in names:
+            value = greeks[name]
+            if is_stock.any():
+                value = np.where(is_stock, S if name == "price" else float(name == "delta"), value)
+            np.multiply(value, weight, out=out[name][block])
+    return out
+
+def aggregate_greeks(position, codes, labels):
+    """Sums per-position Greeks by integer code; one row per label."""
+    return pd.DataFrame({name: np.bincount(codes, weights=values, minlength=len(labels))
+                         for name, values in position.items()}, index=pd.Index(labels))
+
+def book_risk(book: PositionBook, spots, r, sigma, sigma_per_position=False, higher_order=False) -> BookRisk:
+    """Per-position and aggregated risk of a book, by underlying and by expiry bucket."""
+    position = position_greeks(book, spots, r, sigma, sigma_per_position, higher_order)
+    by_underlying = aggregate_greeks(position, book.underlying, book.underlyings)
+    by_underlying.index.name = "underlying"
+    by_expiry = aggregate_greeks(position, book.expiry_bucket(), EXPIRY_BUCKETS)
+    by_expiry.index.name = "expiry_bucket"
+    total = {name: float(values.sum()) for name, values in position.items()}
+    return BookRisk(position=position, by_underlying=by_underlying, by_expiry=by_expiry, total=total)
@@ -0,0 +1,152 @@
+import io
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import urlopen
+
+import pandas as pd
+
+
+# Sources of price history behind pricing.market_data: a provider downloads
+# bars, the cache decides when. YahooProvider is the live source.
+# ReplayProvider serves OHLCV files recorded by record_histories, from a folder
+# or from the same layout over HTTP (benchmarks/fixture_server.py), with the
+# market clock pinned to the recording date, so that pricing and volatility
+# runs are reproducible and need no network.
+
+DEFAULT_PROVIDER = os.environ.get("MARKET_DATA_PROVIDER", "yahoo")  # "yahoo", or "replay:<folder or URL>"
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+def lookback_start(period, now=None):
+    """First date of a yfinance-style period ("60d", "6mo", "1y", "ytd"...), None for "max"."""
+    now = pd.Timestamp.now() if now is None else now
+    if period == "max":
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if match is None:
+        raise ValueError(f"Unknown period: {period}")
+    count, unit = int(match[1]), {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}[match[2]]
+    return (now - pd.DateOffset(**{unit: count})).normalize()
+
+def naive_dates(index):
+    """Exchange-local dates without time zone, for comparisons with plain dates."""
+    return index.tz_localize(None) if getattr(index, "tz", None) is not None else index
+
+
+class MarketDataProvider(ABC):
+    """
+    Bars of one or several tickers as DataFrames indexed by date, with
+    yfinance's columns. Subclasses implement history; histories and now
+    have defaults.
+    """
+
+    def now(self):
+        """Current date and time of the market the provider describes."""
+        return pd.Timestamp.now()
+
+    @abstractmethod
+    def history(self, ticker, interval="1d", period=None, start=None, end=None):
+        """Bars of ticker, empty when there is none."""
+
+    def histories(self, tickers, interval="1d", period=None, start=None, end=None):
+        """{ticker: bars} for several tickers (without the ones that have no data)."""
+        frames = {ticker: self.history(ticker, interval, period, start, end) for ticker in tickers}
+        return {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+
+
+class YahooProvider(MarketDataProvider):
+    """Yahoo Finance, one request per call (several tickers in one for histories)."""
+
+    def history(self, ticker, interval="1d", period=None, start=None, end=None):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).history(period=period, interval=interval, start=start, end=end)
+
+    def histories(self, tickers, interval="1d", period=None, start=None, end=None):
+        import yfinance as yf
+
+        # Same adjustments and columns as Ticker.history
+        data = yf.download(list(tickers), period=period, interval=interval, start=start, end=end, group_by="ticker",
+                           auto_adjust=True, actions=True, progress=False, threads=True)
+        available = set(data.columns.get_level_values(0))
+        return {ticker: data[ticker].dropna(how="all") for ticker in tickers if ticker in available}
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Recorded bars read from location/ohlcv/<TICKER>_<interval>.csv, location
+    being a folder or an http:// URL. now() is the recording date from
+    location/ohlcv/manifest.json unless as_of is given; bars after it are
+    never served.
+    """
+
+    def __init__(self, location, as_of=None):
+        self.location = str(location).rstrip("/")
+        self._as_of = None if as_of is None else pd.Timestamp(as_of)
+        self._recorded = {}  # (ticker, interval) -> frame, each file read once
+
+    def _read(self, name):
+        """Text of a recorded file, None when it was not recorded."""
+        target = f"{self.location}/ohlcv/{name}"
+        try:
+            if "://" in target:
+                with urlopen(target) as response:
+                    return response.read().decode("utf-8")
+            return Path(target).read_text(encoding="utf-8")
+        except (FileNotFoundError, URLError):  # HTTPError (404) included
+            return None
+
+    def now(self):
+        if self._as_of is None:
+            manifest = self._read("manifest.json")
+            self._as_of = pd.Timestamp(json.loads(manifest)["as_of"]) if manifest else pd.Timestamp.now().normalize()
+        return self._as_of
+
+    def _bars(self, ticker, interval):
+        key = ticker.upper(), interval
+        if key not in self._recorded:
+            text = self._read(f"{key[0]}_{interval}.csv")
+            self._recorded[key] = (pd.read_csv(io.StringIO(text), index_col=0, parse_dates=True) if text is not None
+                                   else pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name="Date")))
+        return self._recorded[key]
+
+    def history(self, ticker, interval="1d", period=None, start=None, end=None):
+        frame = self._bars(ticker, interval)
+        now = self.now()
+        first = pd.Timestamp(start) if start is not None else lookback_start(period or "max", now)
+        index = frame.index
+        keep = index <= now
+        if first is not None:
+            keep &= index >= first
+        if end is not None:
+            keep &= index < pd.Timestamp(end)
+        return frame[keep]
+
+
+def make_provider(spec=DEFAULT_PROVIDER) -> MarketDataProvider:
+    """Provider from a setting: "yahoo", or "replay:<folder or URL>"."""
+    if spec == "yahoo":
+        return YahooProvider()
+    if spec.startswith("replay:"):
+        return ReplayProvider(spec[len("replay:"):])
+    raise ValueError(f"Unknown market data provider: {spec}")
+
+def record_histories(provider: MarketDataProvider, tickers, folder, period="5y", interval="1d"):
+    """Saves the bars of tickers as fixtures for ReplayProvider (CSV, one file per ticker, plus a manifest)."""
+    folder = Path(folder) / "ohlcv"
+    folder.mkdir(parents=True, exist_ok=True)
+    frames = provider.histories(tickers, interval, period=period)
+    for ticker, frame in frames.items():
+        frame = frame.copy()
+        frame.index = naive_dates(frame.index)
+        frame.index.name = "Date"
+        frame.to_csv(folder / f"{ticker.upper()}_{interval}.csv")
+    manifest = {"as_of": f"{provider.now():%Y-%m-%d %H:%M:%S}", "interval": interval, "tickers": sorted(frames)}
+    (folder / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return sorted(frames)
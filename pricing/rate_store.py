@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+
+# Time series of the rates gathered by the collector (collector.py). Every
+# collected value is one typed row appended to a SQLite file; nothing is ever
+# rewritten. The FX page reads the snapshot in force at any date, the latest
+# by default: the last observation of each instrument at or before that date,
+# found with one index seek per instrument, whatever the length of the
+# history. WAL mode lets the page read while the collector writes.
+
+DEFAULT_PATH = Path(os.environ.get("RATE_STORE_PATH", Path(__file__).resolve().parent.parent / "data" / "rates.sqlite"))
+SNAPSHOT_COLUMNS = ["instrument", "currency", "tenor_years", "type", "value", "as_of", "source"]
+SNAPSHOT_DTYPES = {"tenor_years": "float64", "value": "float64", "as_of": "datetime64[s]"}
+# Instruments of the FX page: currency (None for the spot), tenor in years and type
+INSTRUMENTS = {
+    "Spot EUR/USD": (None, 0.0, "FX"),
+    "EURIBOR 1M": ("EUR", 1 / 12, "Short Rate"),
+    "EURIBOR 3M": ("EUR", 3 / 12, "Short Rate"),
+    "EURIBOR 6M": ("EUR", 6 / 12, "Short Rate"),
+    "EURIBOR 12M": ("EUR", 1.0, "Short Rate"),
+    "EU Bonds 2Y": ("EUR", 2.0, "Bond"),
+    "EU Bonds 5Y": ("EUR", 5.0, "Bond"),
+    "SOFR 1M": ("USD", 1 / 12, "Short Rate"),
+    "SOFR 3M": ("USD", 3 / 12, "Short Rate"),
+    "SOFR 6M": ("USD", 6 / 12, "Short Rate"),
+    "SOFR 12M": ("USD", 1.0, "Short Rate"),
+    "Treasury Yields 2Y": ("USD", 2.0, "Bond"),
+    "Treasury Yields 5Y": ("USD", 5.0, "Bond"),
+}
+FX_COLUMNS = ["Instrument", "Rate/Price", "Maturity", "Type", "Currency"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    instrument TEXT NOT NULL,
+    currency TEXT,
+    tenor_years REAL NOT NULL,
+    type TEXT NOT NULL,
+    value REAL NOT NULL,
+    as_of TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_by_instrument ON observations (instrument, as_of);
+CREATE TABLE IF NOT EXISTS instruments (instrument TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS collections (as_of TEXT PRIMARY KEY, observations INTEGER NOT NULL);
+"""
+
+
+def _timestamp(value):
+    """Sortable text of a date or time; a plain date stands for the end of that day."""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = pd.Timestamp(value) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    return f"{pd.Timestamp(value):%Y-%m-%d %H:%M:%S}"
+
+def tenor_label(tenor_years, type_):
+    """Maturity as written on the FX page: "Spot", "3M", "12M" for short rates, "2Y"."""
+    if type_ == "FX" or tenor_years == 0:
+        return "Spot"
+    months = round(tenor_years * 12)
+    if type_ == "Short Rate" or months % 12:
+        return f"{months}M"
+    return f"{months // 12}Y"
+
+def fx_market_data(snapshot):
+    """Snapshot in the layout of FX.get_initial_market_data, in the order of INSTRUMENTS."""
+    order = {name: i for i, name in enumerate(INSTRUMENTS)}
+    snapshot = snapshot.sort_values("instrument", key=lambda names: names.map(order).fillna(len(order)))
+    return pd.DataFrame({
+        "Instrument": snapshot["instrument"].to_numpy(),
+        "Rate/Price": snapshot["value"].to_numpy(dtype=float),
+        "Maturity": [tenor_label(tenor, type_) for tenor, type_ in zip(snapshot["tenor_years"], snapshot["type"])],
+        "Type": snapshot["type"].to_numpy(),
+        "Currency": [currency if isinstance(currency, str) else None for currency in snapshot["currency"]],
+    }, columns=FX_COLUMNS)
+
+
+class RateStore:
+    """Append-only SQLite store of typed rate observations (SNAPSHOT_COLUMNS)."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._local = threading.local()  # One connection per thread
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def append(self, observations):
+        """Adds observations (a DataFrame with SNAPSHOT_COLUMNS) as one collection; returns the number of rows."""
+        missing = set(SNAPSHOT_COLUMNS) - set(observations.columns)
+        if missing:
+            raise ValueError(f"Missing observation columns: {sorted(missing)}")
+        if observations.empty:
+            return 0
+        rows = [(instrument, currency, float(tenor), type_, float(value), _timestamp(as_of), source)
+                for instrument, currency, tenor, type_, value, as_of, source
+                in observations[SNAPSHOT_COLUMNS].itertuples(index=False)]
+        connection = self._connection()
+        with connection:
+            connection.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany("INSERT OR IGNORE INTO instruments VALUES (?)", {(row[0],) for row in rows})
+            connection.executemany(
+                "INSERT INTO collections VALUES (?, ?) ON CONFLICT (as_of) DO UPDATE SET observations = observations + ?",
+                [(as_of, count, count) for as_of, count in Counter(row[5] for row in rows).items()])
+        return len(rows)
+
+    def snapshot(self, as_of=None):
+        """
+        Last observation of every instrument at or before as_of (a time, or a
+        date for the end of that day; None for the latest), as a DataFrame with
+        SNAPSHOT_COLUMNS. Empty when nothing was collected by then.
+        """
+        if not self.path.exists():
+            return pd.DataFrame(columns=SNAPSHOT_COLUMNS).astype(SNAPSHOT_DTYPES)
+        until = _timestamp(as_of) if as_of is not None else "9999-12-31 23:59:59"
+        rows = self._connection().execute(f"""
+            SELECT {", ".join(f"o.{column}" for column in SNAPSHOT_COLUMNS)}
+            FROM instruments AS i JOIN observations AS o ON o.rowid = (
+                SELECT rowid FROM observations
+                WHERE instrument = i.instrument AND as_of <= ?
+                ORDER BY as_of DESC LIMIT 1)
+        """, (until,)).fetchall()
+        snapshot = pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+        snapshot["as_of"] = pd.to_datetime(snapshot["as_of"])
+        return snapshot.astype(SNAPSHOT_DTYPES)
+
+    def dates(self):
+        """Days with at least one collection, most recent first."""
+        if not self.path.exists():
+            return []
+        rows = self._connection().execute(
+            "SELECT DISTINCT substr(as_of, 1, 10) FROM collections ORDER BY 1 DESC").fetchall()
+        return [date.fromisoformat(day) for (day,) in rows]
+
+
+RATE_STORE = RateStore()
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import List, Optional, Literal
+
+
+# Definition of types
+@dataclass
+class StrategyOption:
+    type: Literal["call", "put", "stock"]
+    strike: float
+    premium: float
+    quantity: int
+    position: Literal["long", "short"]
+
+@dataclass
+class Strategy:
+    id: str
+    name: str
+    description: str
+    legs: List[StrategyOption]
+    interview_notes: str  # Specific notes for interviews
+    max_profit: Optional[float] = None
+    max_loss: Optional[float] = None
+    break_even_points: Optional[List[float]] = None
+
+
+# Calculation functions
+def calculate_intrinsic_value(option: StrategyOption, underlying_price: float) -> float:
+    """Calculates the intrinsic value of an option"""
+    if option.type == "stock":
+        return underlying_price - option.strike
+    elif option.type == "call":
+        return max(0, underlying_price - option.strike)
+    else:  # put
+        return max(0, option.strike - underlying_price)
+
+def calculate_option_pl(option: StrategyOption, underlying_price: float) -> float:
+    """Calculates the profit/loss for an individual option at a given price"""
+    if option.type == "stock":
+        pl = (underlying_price - option.premium) * option.quantity
+        return pl if option.position == "long" else -pl
+        
+    intrinsic = calculate_intrinsic_value(option, underlying_price)
+    
+    if option.position == "long":
+        return (intrinsic - option.premium) * option.quantity
+    else:  # position == "short"
+        return (option.premium - intrinsic) * option.quantity
+
+def calculate_profit_loss(strategy: Strategy, underlying_price: float) -> float:
+    """Calculates the total profit/loss for a strategy at a given price"""
+    return sum(calculate_option_pl(leg, underlying_price) for leg in strategy.legs)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from pricing.black_scholes import HIGHER_ORDER_GREEKS, bs_price_and_greeks
+
+
+# Second axis of each surface, crossed with the spot axis
+SURFACE_AXES = {"time": "Time to Expiry (years)", "vol": "Volatility"}
+SURFACE_GREEKS = ["price", "delta", "gamma", "theta", "vega", "rho", "charm"]
+
+
+def greek_surface(greek, spots, axis, axis_values, K, T, r, sigma, option_type="call"):
+    """
+    Evaluates a Greek over a (axis_values x spots) grid in one broadcast.
+
+    axis is "time" (axis_values replace T) or "vol" (axis_values replace sigma).
+    Rows follow axis_values and columns follow spots, which is the layout
+    plotly expects for heatmaps and surfaces.
+    """
+    spots = np.asarray(spots, dtype=float)[None, :]
+    axis_values = np.asarray(axis_values, dtype=float)[:, None]
+    if axis == "time":
+        T = axis_values
+    elif axis == "vol":
+        sigma = axis_values
+    else:
+        raise ValueError(f"Unknown surface axis: {axis}")
+
+    greeks = bs_price_and_greeks(spots, K, T, r, sigma, option_type, higher_order=greek in HIGHER_ORDER_GREEKS)
+    values = getattr(greeks, greek)
+    return np.broadcast_to(values, (axis_values.shape[0], spots.shape[1]))
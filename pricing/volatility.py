@@ -0,0 +1,191 @@
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricing.market_data import MARKET_DATA
+
+
+# Historical volatility of a whole universe at once. Bars are laid out as one
+# (dates x tickers) matrix per field, so every estimator is a handful of
+# vectorized operations, rolling windows included (differences of cumulative
+# sums), whatever the number of tickers. Range-based estimators (Parkinson, Garman-Klass, Yang-Zhang) use
+# open, high and low as well as the close and need fewer bars than
+# close-to-close for the same precision. All values are annualized.
+# UniverseVolatility keeps the table of a whole universe up to date in a
+# background thread, so that a page never waits for the universe download to
+# show the volatility of the one ticker it asks for.
+
+VOL_ESTIMATORS = ["close_to_close", "ewma", "parkinson", "garman_klass", "yang_zhang"]
+VOL_ESTIMATOR_LABELS = {"close_to_close": "Close-to-Close", "ewma": "EWMA", "parkinson": "Parkinson",
+                        "garman_klass": "Garman-Klass", "yang_zhang": "Yang-Zhang"}
+# Rolling windows in trading days matching the market data lookbacks
+VOL_WINDOWS = {"60d": 40, "1y": 250, "5y": 1250}
+TRADING_DAYS = 252
+# Tickers of the precomputed table, e.g. VOLATILITY_UNIVERSE="AAPL,MSFT,SPY"
+DEFAULT_UNIVERSE = [ticker.strip().upper() for ticker in os.environ.get(
+    "VOLATILITY_UNIVERSE", "AAPL,MSFT,AMZN,GOOGL,META,NVDA,TSLA,JPM,XOM,SPY,QQQ").split(",") if ticker.strip()]
+UNIVERSE_TTL = 900  # Seconds before the universe table is recomputed
+FIELDS = ["Open", "High", "Low", "Close"]
+TABLE_COLUMNS = ["ticker", "estimator", "window", "volatility", "as_of"]
+
+
+def bar_matrices(histories, fields=FIELDS):
+    """{field: (dates x tickers) DataFrame} from {ticker: bars}, aligned on calendar dates (NaN where a ticker has no bar)."""
+    dates = {}
+    for ticker, frame in histories.items():
+        index = frame.index.tz_localize(None) if getattr(frame.index, "tz", None) is not None else frame.index
+        dates[ticker] = index.normalize()
+    calendar = pd.DatetimeIndex(np.unique(np.concatenate([index.to_numpy() for index in dates.values()])))
+    # One dense (dates x tickers x fields) block: DataFrames assembled column by column
+    # would keep a block per ticker and make every later operation loop over them
+    values = np.full((len(calendar), len(histories), len(fields)), np.nan)
+    for column, (ticker, frame) in enumerate(histories.items()):
+        values[calendar.get_indexer(dates[ticker]), column] = frame[fields].to_numpy(dtype=float)
+    return {field: pd.DataFrame(np.ascontiguousarray(values[:, :, i]), index=calendar, columns=list(histories))
+            for i, field in enumerate(fields)}
+
+def _rolling(values, window, squares=False):
+    """
+    Rolling sums of a (dates x tickers) matrix (and of its squares) with the
+    number of valid entries per window, from cumulative sums over the whole
+    matrix at once. Missing bars (holidays of one exchange, late listings)
+    only shrink their windows.
+    """
+    x = values.to_numpy(dtype=float)
+    valid = ~np.isnan(x)
+    x = np.where(valid, x, 0.0)
+    # Window i covers rows start[i]..i, a difference of two rows of the cumulative sums
+    start = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+    out = []
+    for term in [valid.astype(float), x, x * x][:3 if squares else 2]:
+        cumulative = np.concatenate([np.zeros((1, x.shape[1])), np.cumsum(term, axis=0)])
+        out.append(cumulative[1:] - cumulative[start])
+    return out
+
+def _rolling_mean(values, window):
+    count, total = _rolling(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count >= max(2, int(0.8 * window)), total / count, np.nan)
+    return pd.DataFrame(mean, index=values.index, columns=values.columns)
+
+def _rolling_var(values, window):
+    count, total, squares = _rolling(values, window, squares=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (squares - total * total / count) / (count - 1)
+    var = np.where(count >= max(2, int(0.8 * window)), np.maximum(var, 0.0), np.nan)
+    return pd.DataFrame(var, index=values.index, columns=values.columns)
+
+def rolling_volatility(bars, estimator="close_to_close", window=40):
+    """
+    Annualized volatility of every ticker over a rolling window of bars.
+
+    bars holds (dates x tickers) "Open", "High", "Low" and "Close" matrices as
+    returned by bar_matrices ("Close" alone is enough for close_to_close and
+    ewma). For ewma the window is the span of the exponential weights
+    (span 32 is RiskMetrics' lambda = 0.94).
+    """
+    if estimator not in VOL_ESTIMATORS:
+        raise ValueError(f"Unknown volatility estimator: {estimator}")
+    close = bars["Close"]
+    previous_close = close.shift(1)
+
+    if estimator == "close_to_close":
+        variance = _rolling_var(np.log(close / previous_close), window)
+    elif estimator == "ewma":
+        variance = (np.log(close / previous_close) ** 2).ewm(span=window, min_periods=window // 2).mean()
+    else:
+        high_low = np.log(bars["High"] / bars["Low"])
+        if estimator == "parkinson":
+            variance = _rolling_mean(high_low ** 2, window) / (4 * math.log(2))
+        elif estimator == "garman_klass":
+            close_open = np.log(close / bars["Open"])
+            variance = _rolling_mean(0.5 * high_low ** 2 - (2 * math.log(2) - 1) * close_open ** 2, window)
+        else:
+            # Overnight, open-to-close and Rogers-Satchell terms, the latter free of drift
+            log_open, log_high, log_low = np.log(bars["Open"]), np.log(bars["High"]), np.log(bars["Low"])
+            log_close = np.log(close)
+            overnight = log_open - np.log(previous_close)
+            open_close = log_close - log_open
+            rogers_satchell = (log_high - log_close) * (log_high - log_open) + (log_low - log_close) * (log_low - log_open)
+            k = 0.34 / (1.34 + (window + 1) / (window - 1))
+            variance = (_rolling_var(overnight, window) + k * _rolling_var(open_close, window)
+                        + (1 - k) * _rolling_mean(rogers_satchell, window))
+    # Garman-Klass can go slightly negative on a quiet window
+    return np.sqrt(variance.clip(lower=0.0) * TRADING_DAYS)
+
+def volatility_table(bars, windows=tuple(VOL_WINDOWS.values()), estimators=VOL_ESTIMATORS):
+    """
+    Latest value of every estimator and window for every ticker, as a tidy
+    table with "ticker", "estimator", "window", "volatility" and "as_of"
+    columns (as_of is the date of the last bar used for that ticker).
+    """
+    rows = []
+    for estimator in estimators:
+        for window in windows:
+            rolling = rolling_volatility(bars, estimator, window)
+            values = rolling.to_numpy()
+            valid = ~np.isnan(values)
+            # Last valid row of every column
+            last = values.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+            has_value = valid.any(axis=0)
+            columns = np.arange(values.shape[1])
+            rows.append(pd.DataFrame({
+                "ticker": rolling.columns,
+                "estimator": estimator,
+                "window": window,
+                "volatility": np.where(has_value, values[last, columns], np.nan),
+                "as_of": rolling.index[last].where(has_value),
+            }))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=TABLE_COLUMNS)
+
+def universe_volatility(tickers=DEFAULT_UNIVERSE, windows=tuple(VOL_WINDOWS.values()), estimators=VOL_ESTIMATORS,
+                        lookback="5y", cache=MARKET_DATA):
+    """
+    volatility_table of a universe, its histories brought up to date by the
+    market data cache in batched downloads. Tickers without data are left out.
+    """
+    histories = cache.histories(tickers, period=lookback)
+    if not histories:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+    return volatility_table(bar_matrices(histories), windows, estimators)
+
+
+class UniverseVolatility:
+    """universe_volatility of tickers, computed and refreshed in the background."""
+
+    def __init__(self, tickers=DEFAULT_UNIVERSE, ttl=UNIVERSE_TTL, lookback="5y", cache=MARKET_DATA):
+        self.tickers, self.ttl, self.lookback, self.cache = list(tickers), ttl, lookback, cache
+        self._table = None
+        self._computed_at = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def _compute(self):
+        try:
+            table = universe_volatility(self.tickers, lookback=self.lookback, cache=self.cache)
+            with self._lock:
+                self._table, self._computed_at = table, time.monotonic()
+        except Exception:
+            pass  # The previous table, if any, stays in place until the next attempt
+        finally:
+            with self._lock:
+                self._running = False
+
+    def table(self):
+        """
+        The latest table, or None while the first one is computed. A missing
+        or expired table starts a background computation; this never blocks.
+        """
+        with self._lock:
+            expired = self._computed_at is None or time.monotonic() - self._computed_at > self.ttl
+            if expired and not self._running:
+                self._running = True
+                threading.Thread(target=self._compute, daemon=True).start()
+            return self._table
+
+
+UNIVERSE_VOLATILITY = UniverseVolatility()
@@ -0,0 +1,32 @@
+import numpy as np
+
+from pricing.lattice import lattice_price
+from pricing.memo import PricingCache
+
+
+def _payoff_curve(S, K, premium):
+    return np.maximum(np.linspace(0.5 * K, 1.5 * K, 11) - K, 0.0) - premium
+
+
+def test_american_price_keys_the_cache():
+    # The Pricer's American path: the lattice price feeds memoized calls (payoff curves)
+    cache = PricingCache()
+    curve = cache.memoize(_payoff_curve)
+    american = lattice_price(100.0, 100.0, 0.5, 0.03, 0.2, "put", american=True, steps=200)
+
+    first = curve(100.0, 100.0, float(american.price))
+    second = curve(100.0, 100.0, float(american.price))
+
+    stats = cache.stats()
+    assert second is first
+    assert (stats.hits, stats.misses, stats.bypassed) == (1, 1, 0)
+
+
+def test_zero_dimensional_array_bypasses_the_cache():
+    cache = PricingCache()
+    curve = cache.memoize(_payoff_curve)
+    american = lattice_price(100.0, 100.0, 0.5, 0.03, 0.2, "put", american=True, steps=200)
+
+    curve(100.0, 100.0, american.price)
+
+    assert cache.stats().bypassed == 1
@@ -0,0 +1,14 @@
+from pricing.black_scholes import bs_price_and_greeks
+from pricing.monte_carlo import monte_carlo_price
+from pricing.strategies import StrategyOption
+
+
+def test_control_variate_reduces_european_error():
+    legs = [StrategyOption("call", 100.0, 0.0, 1, "long")]
+    exact = bs_price_and_greeks(100.0, 100.0, 1.0, 0.03, 0.25, "call").price
+
+    controlled = monte_carlo_price(legs, 100.0, 1.0, 0.03, 0.25, n_paths=50_000)
+    plain = monte_carlo_price(legs, 100.0, 1.0, 0.03, 0.25, n_paths=50_000, control_variate=False)
+
+    assert 0 < controlled.std_error < plain.std_error / 2
+    assert abs(controlled.price - exact) < 4 * controlled.std_error
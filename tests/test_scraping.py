@@ -0,0 +1,23 @@
+from Scraping import EURIBOR_URL, SCRAPERS, run_collection
+
+
+class _FailingEuribor:
+    """Euribor's site raises, every other page has no data and the EUR/USD rate is known."""
+
+    def page(self, url, timeout=10):
+        if url == EURIBOR_URL:
+            raise ConnectionError("site down")
+        return "<html><body></body></html>"
+
+    def exchange_rate(self, base, quote, timeout=10):
+        return 1.1
+
+
+def test_run_collection_reports_a_failing_source():
+    observations, report = run_collection(_FailingEuribor(), scrapers=[(name, func, 5) for name, func, _ in SCRAPERS])
+    statuses = dict(zip(report["Source"], report["Statut"]))
+
+    assert statuses["Euribor"] == "erreur : site down"
+    assert statuses["SOFR"] == "vide"
+    assert statuses["EUR/USD"] == "ok"
+    assert list(observations["instrument"]) == ["Spot EUR/USD"]